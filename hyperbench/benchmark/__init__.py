@@ -1,2 +1,3 @@
 from .benchmark_config import BenchmarkConfig
 from .benchmark_runner import BenchmarkRunner
+from .parallel_runner import ParallelBenchmarkRunner
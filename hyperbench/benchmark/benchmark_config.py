@@ -1,7 +1,10 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from sklearn.model_selection import BaseShuffleSplit
 
+from hyperbench.cache import EvaluationCache
+from hyperbench.dataset import SplitCache
 from hyperbench.optimizers.base import Optimizer
 from hyperbench.provider import Provider
 from hyperbench.target_algorithms import BaseTarget
@@ -23,3 +26,23 @@ class BenchmarkConfig:
     search_eval_splits: BaseShuffleSplit
     train_test_splits: BaseShuffleSplit
 
+    # Number of cores for a single experiment, divided over the cross-validation folds and the threads of the target
+    # algorithm. None means that every experiment uses all cores.
+    cpus_per_experiment: Optional[int] = None
+
+    # Stores the results of evaluations, so that they are not repeated by reruns or other optimizers
+    evaluation_cache: Optional[EvaluationCache] = None
+
+    # Splits the search set into train/test folds once, and shares them with one pool of workers for all evaluations
+    shared_folds: bool = False
+
+    # Evaluates the shared folds in a pool of worker processes that is kept for the whole benchmark. The parallel runner
+    # already runs the experiments in processes, and uses shared folds without a pool instead.
+    worker_pool: bool = False
+
+    # Keeps the transformed search and evaluation sets, so that they are shared by all seeds, targets and optimizers
+    split_cache: Optional[SplitCache] = None
+
+    # Records the wall-clock time, CPU time and memory of the sections of every experiment, such as the evaluations and
+    # the EPM, in a trace and in a breakdown in the statistics
+    profile: bool = False
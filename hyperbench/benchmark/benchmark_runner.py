@@ -1,18 +1,27 @@
-import json
-import os
 import time
 from datetime import datetime
 
+from joblib import effective_n_jobs
 from rich.console import Console
 from rich.progress import Progress, TextColumn, BarColumn, MofNCompleteColumn, TimeRemainingColumn, TimeElapsedColumn
 
+from hyperbench.resources import CPUBudget, Profiler
+from hyperbench.results import open_results, JournaledEvaluator
+from hyperbench.target_algorithms.executor import EvaluationExecutor
+from hyperbench.target_algorithms.folds import SharedFolds
+
 
 class BenchmarkRunner:
 
-    def __init__(self, benchmark):
+    def __init__(self, benchmark, progress=None):
         self.benchmark = benchmark
-        progress = Progress(TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(),
-                            TimeRemainingColumn(), TimeElapsedColumn())
+        self.results = open_results(benchmark.output_folder)
+        self.cpu_budget = CPUBudget(benchmark.cpus_per_experiment, benchmark.train_test_splits.get_n_splits())
+        self.executor = EvaluationExecutor(effective_n_jobs(self.cpu_budget.cv_jobs), self.cpu_budget.model_jobs) \
+            if benchmark.worker_pool else None
+        if progress is None:
+            progress = Progress(TextColumn("[progress.description]{task.description}"), BarColumn(),
+                                MofNCompleteColumn(), TimeRemainingColumn(), TimeElapsedColumn())
 
         self.track_seeds = progress.add_task("Seeds", total=len(self.benchmark.seeds))
         self.track_targets = progress.add_task("Targets", total=len(self.benchmark.target_algorithms))
@@ -25,7 +34,11 @@ class BenchmarkRunner:
 
     def start(self):
         with self.progress as progress:
-            self.loop_seeds()
+            try:
+                self.loop_seeds()
+            finally:
+                if self.executor is not None:
+                    self.executor.shutdown()
 
     def loop_seeds(self):
         self.progress.reset(self.track_seeds)
@@ -42,75 +55,103 @@ class BenchmarkRunner:
     def loop_datasets(self, seed, target):
         self.progress.reset(self.track_data)
         for provider in self.benchmark.datasets:
-            self.loop_optimizers(seed, target, provider.data)
+            self.loop_optimizers(seed, target, provider)
             self.progress.update(self.track_data, advance=1)
 
-    def loop_optimizers(self, seed, target, dataset):
+    def loop_optimizers(self, seed, target, provider):
         self.progress.reset(self.track_opt)
         for optimizer in self.benchmark.optimizers:
-            self.loop_splits(seed, target, dataset, optimizer)
+            self.loop_splits(seed, target, provider, optimizer)
             self.progress.update(self.track_opt, advance=1)
 
-    def loop_splits(self, seed, target, dataset, optimizer):
-        if self.check_if_run_exists(seed, target.name, dataset.metadata, optimizer.name):
-            return False
+    def loop_splits(self, seed, target, provider, optimizer):
+        profiler = Profiler(self.benchmark.profile)
+        with profiler.section("load_data"):
+            # Providers keep their data, so it is only loaded by the first experiment. Providers without stored
+            # metadata already load it to read the metadata.
+            metadata = provider.metadata
+            if self.check_if_run_exists(seed, target.name, metadata, optimizer.name):
+                return False
+            dataset = provider.data
         self.progress.reset(self.track_splits)
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.progress.console.print(f"[{ts}] {seed} > {target.name} > {dataset.metadata.name} > {optimizer.name}")
-        for search_indices, eval_indices in self.benchmark.search_eval_splits.split(dataset.X, dataset.y):
-            search_set, eval_set = dataset.split(search_indices, eval_indices)
-            new_search_set, new_eval_set = self.benchmark.transformer.transform(search_set, eval_set)
+        self.progress.console.print(f"[{ts}] {seed} > {target.name} > {metadata.name} > {optimizer.name}")
+        with self.cpu_budget.limit():
+            self.run_splits(seed, target, dataset, optimizer, profiler)
+        return True
+
+    def run_splits(self, seed, target, dataset, optimizer, profiler=None):
+        profiler = profiler or Profiler(enabled=False)
+        splits = self.benchmark.search_eval_splits.split(dataset.X, dataset.y)
+        for split, (search_indices, eval_indices) in enumerate(splits):
+            with profiler.section("transform", split=split):
+                new_search_set, new_eval_set = self.transform(dataset, search_indices, eval_indices)
+            journal = self.results.journal(target.name, optimizer.name, seed, dataset.metadata.name, split)
 
             self.progress.reset(self.track_stage)
             tic = time.perf_counter()
-            search_trajectory, stats = self.search_stage(seed, target, new_search_set, optimizer)
+            search_trajectory, stats = self.search_stage(seed, target, new_search_set, optimizer, journal, profiler)
             toc = time.perf_counter()
             self.progress.update(self.track_stage, advance=1)
-            eval_trajectory = self.evaluation_stage(target, new_search_set, new_eval_set, search_trajectory)
+            with profiler.section("replay", split=split):
+                eval_trajectory = self.evaluation_stage(target, new_search_set, new_eval_set, search_trajectory)
             self.progress.update(self.track_stage, advance=1)
 
-            self.save(search_trajectory, seed, target.name, dataset.metadata.name, optimizer.name,
-                      "search")
-            self.save(eval_trajectory, seed, target.name, dataset.metadata.name, optimizer.name,
-                      "eval")
-            self.save_stats(stats, seed, target.name, dataset.metadata, optimizer.name, toc - tic)
+            stats = {**stats, "dataset_id": dataset.metadata.id, "perf_time": toc - tic}
+            trace = None
+            if profiler.enabled:
+                stats["profile"], trace = profiler.summary(), profiler.trace()
+            self.results.commit(target.name, optimizer.name, seed, dataset.metadata.name, search_trajectory,
+                                eval_trajectory, stats, trace)
+            journal.remove()
             self.progress.update(self.track_splits, advance=1)
 
-    def save(self, trajectory, seed: int, target: str, dataset: str, optimizer: str, stage: str):
-        seed = str(seed)
-        path = os.path.join(self.benchmark.output_folder, target, optimizer, seed, dataset)
-        file = os.path.join(path, f"{stage}.json")
-        os.makedirs(path, exist_ok=True)
-        trajectory.save(file)
-
-    def save_stats(self, stats, seed, target, metadata, optimizer, timing):
-        seed = str(seed)
-        path = os.path.join(self.benchmark.output_folder, target, optimizer, seed, metadata.name)
-        file = os.path.join(path, "stats.json")
-        os.makedirs(path, exist_ok=True)
-        with open(file, "w+") as f:
-            json.dump({**stats, "dataset_id": metadata.id, "perf_time": timing}, f, indent=2)
+    def transform(self, dataset, search_indices, eval_indices):
+        if self.benchmark.split_cache is not None:
+            return self.benchmark.split_cache.get(dataset, search_indices, eval_indices, self.benchmark.transformer)
+        return self.benchmark.transformer.transform(*dataset.split(search_indices, eval_indices))
 
     def check_if_run_exists(self, seed, target, metadata, optimizer):
-        seed = str(seed)
-        path = os.path.join(self.benchmark.output_folder, target, optimizer, seed, metadata.name)
-        return os.path.exists(path)
+        return self.results.exists(target, optimizer, seed, metadata.name)
 
-    def search_stage(self, seed, target, dataset, optimizer):
+    def search_stage(self, seed, target, dataset, optimizer, journal, profiler=None):
+        profiler = profiler or Profiler(enabled=False)
         self.progress.reset(self.track_iterations)
         self.progress.update(self.track_iterations, total=self.benchmark.budget * optimizer.budget_multiplier)
+        folds = SharedFolds(dataset, self.benchmark.train_test_splits, self.cpu_budget.cv_jobs, self.executor) \
+            if self.benchmark.shared_folds or self.executor is not None else None
         tae_runner = target.get_config_evaluator(dataset, self.benchmark.train_test_splits, self.benchmark.scoring,
-                                                 self.progress, self.track_iterations)
-        optimizer.initialize(tae_runner, seed, dataset, self.benchmark.budget, self.benchmark.time_based, target)
-        optimizer.search()
+                                                 self.progress, self.track_iterations, self.cpu_budget, folds,
+                                                 profiler)
+        if self.benchmark.evaluation_cache is not None:
+            tae_runner = self.benchmark.evaluation_cache.wrap(tae_runner, target, dataset,
+                                                              self.benchmark.train_test_splits, self.benchmark.scoring,
+                                                              self.progress, self.track_iterations)
+        journaled = JournaledEvaluator(tae_runner, journal, self.progress, self.track_iterations)
+        if journaled.runs:
+            self.progress.console.print(f"Resuming from {sum(map(len, journaled.runs.values()))} journaled evaluations")
+        optimizer.initialize(journaled, seed, dataset, self.benchmark.budget, self.benchmark.time_based, target)
+        if profiler.enabled:
+            optimizer.profile(profiler)
+        try:
+            with profiler.section("search"):
+                optimizer.search()
+        finally:
+            journal.close()
+            if folds is not None:
+                folds.close()
         self.progress.reset(self.track_iterations)
-        return optimizer.get_trajectory(), optimizer.get_stats()
+
+        stats = optimizer.get_stats()
+        if self.benchmark.evaluation_cache is not None:
+            stats = {**stats, **tae_runner.get_stats()}
+        if journaled.replayed:
+            stats = {**stats, "replayed_runs": journaled.replayed}
+        return optimizer.get_trajectory(), stats
 
     def evaluation_stage(self, target, search_set, eval_set, search_trajectory):
         self.progress.reset(self.track_iterations)
-        total_inc = len([seed for item in search_trajectory.as_list for seed in item.seeds])
-        self.progress.update(self.track_iterations, total=total_inc)
         eval_trajectory = target.replay_trajectory(search_trajectory, self.benchmark.scoring, search_set, eval_set,
-                                                   self.progress, self.track_iterations)
+                                                   self.progress, self.track_iterations, self.cpu_budget)
         return eval_trajectory
 
@@ -0,0 +1,171 @@
+import dataclasses
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import Manager
+
+from rich.progress import Progress, TextColumn, BarColumn, MofNCompleteColumn, TimeRemainingColumn, TimeElapsedColumn
+
+from hyperbench.benchmark.benchmark_runner import BenchmarkRunner
+
+# State of a worker process, set once by the pool initializer
+_worker = {}
+
+
+class ParallelBenchmarkRunner:
+    """
+    Runs the cells of the experiment grid (seed, target algorithm, dataset, optimizer) as independent jobs in a
+    process pool. Every job is executed by a regular BenchmarkRunner inside the worker, so the results are written to
+    the same location as with the serial runner, and experiments that already exist are skipped in the same way.
+
+    The number of workers and the cores per experiment (`cpus_per_experiment` in the config) are chosen such that
+    together they do not use more than the available cores. If only one of them is given, the other is derived from it.
+    """
+
+    stages = ["search", "eval", "done"]
+
+    def __init__(self, benchmark, n_workers=None):
+        n_cpus = os.cpu_count()
+        if n_workers is None:
+            n_workers = max(1, n_cpus // (benchmark.cpus_per_experiment or 1))
+        if benchmark.cpus_per_experiment is None:
+            benchmark = dataclasses.replace(benchmark, cpus_per_experiment=max(1, n_cpus // n_workers))
+        if benchmark.worker_pool:
+            # Every worker would start a pool of its own for each experiment, so the folds are shared within the worker
+            benchmark = dataclasses.replace(benchmark, worker_pool=False, shared_folds=True)
+
+        self.benchmark = benchmark
+        self.n_workers = n_workers
+        progress = Progress(TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                            TimeRemainingColumn(), TimeElapsedColumn())
+
+        self.track_experiments = progress.add_task("Experiments", total=len(self.jobs()))
+        self.track_workers = [progress.add_task(f"Worker {i}: idle", total=None) for i in range(self.n_workers)]
+        self.labels = ["idle"] * self.n_workers
+        self.worker_stages = [0] * self.n_workers
+        self.progress = progress
+
+    def jobs(self):
+        # Same order as the nested loops of the serial runner
+        return [
+            (seed, t, d, o)
+            for seed in self.benchmark.seeds
+            for t in range(len(self.benchmark.target_algorithms))
+            for d in range(len(self.benchmark.datasets))
+            for o in range(len(self.benchmark.optimizers))
+        ]
+
+    def start(self):
+        with self.progress:
+            self.fetch_datasets()
+            with Manager() as manager:
+                messages = manager.Queue()
+                slots = manager.Queue()
+                for slot in range(self.n_workers):
+                    slots.put(slot)
+
+                with ProcessPoolExecutor(self.n_workers, initializer=_init_worker,
+                                         initargs=(self.benchmark, slots, messages)) as executor:
+                    futures = [executor.submit(_run_experiment, *job) for job in self.jobs()]
+                    try:
+                        self.wait_for(futures, messages)
+                    except BaseException:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+
+    def fetch_datasets(self):
+        # Load the datasets up front, so that the workers do not download the same files concurrently
+        track_fetch = self.progress.add_task("Fetching datasets", total=len(self.benchmark.datasets))
+        for provider in self.benchmark.datasets:
+            _ = provider.data
+            self.progress.update(track_fetch, advance=1)
+        self.progress.remove_task(track_fetch)
+
+    def wait_for(self, futures, messages):
+        pending = set(futures)
+        while pending:
+            self.handle_messages(messages)
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+                self.progress.update(self.track_experiments, advance=1)
+        self.handle_messages(messages)
+
+    def handle_messages(self, messages):
+        while True:
+            try:
+                slot, action, args = messages.get_nowait()
+            except queue.Empty:
+                return
+
+            track = self.track_workers[slot]
+            if action == "print":
+                self.progress.console.print(*args)
+            elif action == "label":
+                self.labels[slot] = args[0]
+                self.worker_stages[slot] = 0
+                self.progress.reset(track, total=None)
+            elif action == "stage":
+                self.worker_stages[slot] = min(self.worker_stages[slot] + args[0], len(self.stages) - 1)
+            elif action == "reset":
+                self.progress.reset(track)
+            elif action == "update":
+                self.progress.update(track, **args[0])
+
+            stage = self.stages[self.worker_stages[slot]] if self.labels[slot] != "idle" else ""
+            self.progress.update(track, description=f"Worker {slot}: {self.labels[slot]} {stage}")
+
+
+class WorkerProgress:
+    """
+    Stands in for a rich Progress inside a worker process. Updates of the tracks that describe the state of a single
+    experiment (stage and iterations) are sent to the main process; the other tracks are ignored.
+    """
+
+    def __init__(self, messages, slot):
+        self.messages = messages
+        self.slot = slot
+        self.console = WorkerConsole(self)
+
+    def send(self, action, *args):
+        self.messages.put((self.slot, action, args))
+
+    def add_task(self, description, **kwargs):
+        return description
+
+    def reset(self, task, **kwargs):
+        if task in ["Search"]:
+            self.send("reset")
+
+    def update(self, task, advance=None, total=None, **kwargs):
+        if task == "Stage" and advance:
+            self.send("stage", advance)
+        elif task in ["Search"]:
+            self.send("update", {"advance": advance, "total": total})
+
+
+class WorkerConsole:
+
+    def __init__(self, progress: WorkerProgress):
+        self.progress = progress
+
+    def print(self, *objects):
+        self.progress.send("print", *objects)
+
+
+def _init_worker(benchmark, slots, messages):
+    _worker["benchmark"] = benchmark
+    _worker["progress"] = WorkerProgress(messages, slots.get())
+
+
+def _run_experiment(seed, target_index, dataset_index, optimizer_index):
+    benchmark, progress = _worker["benchmark"], _worker["progress"]
+    target = benchmark.target_algorithms[target_index]
+    provider = benchmark.datasets[dataset_index]
+    optimizer = benchmark.optimizers[optimizer_index]
+
+    progress.send("label", f"{seed} > {target.name} > {provider.metadata.name} > {optimizer.name}")
+    runner = BenchmarkRunner(benchmark, progress)
+    ran = runner.loop_splits(seed, target, provider, optimizer)
+    progress.send("label", "idle")
+    return ran
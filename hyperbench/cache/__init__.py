@@ -0,0 +1 @@
+from .evaluation_cache import EvaluationCache
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+class EvaluationCache:
+    """
+    Persistent cache of the losses returned by the config evaluators. An evaluation is identified by the target
+    algorithm, the dataset, a fingerprint of the search set and the train/test splits, the configuration and the seed.
+    The cache is stored in a SQLite file, so that it can be shared by reruns and by the workers of the parallel runner.
+    When it holds more than `max_entries` evaluations, the least recently used ones are removed.
+    """
+
+    def __init__(self, file: str, max_entries: int = 1_000_000):
+        self.file = file
+        self.max_entries = max_entries
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_connection": None, "_pid": None}
+
+    @property
+    def connection(self):
+        # Connections can not be shared between processes, so every process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            folder = os.path.dirname(self.file)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.file, timeout=60)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS evaluations "
+                                     "(key TEXT PRIMARY KEY, loss REAL, last_used INTEGER NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used)")
+            self._connection.commit()
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str):
+        with self.connection as connection:
+            row = connection.execute("SELECT loss FROM evaluations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE evaluations SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        return row[0]
+
+    def put(self, key: str, loss: float):
+        with self.connection as connection:
+            connection.execute("INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?)",
+                               (key, float(loss), time.time_ns()))
+            connection.execute("DELETE FROM evaluations WHERE key IN (SELECT key FROM evaluations "
+                               "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    @staticmethod
+    def fingerprint(dataset, train_test_splits, scoring):
+        # Identifies the search set (and with that the search/eval split and the transformer), the train/test splits
+        # and the scoring
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(dataset.X).tobytes())
+        digest.update(np.ascontiguousarray(dataset.y).tobytes())
+        digest.update(repr(train_test_splits).encode())
+        digest.update(str(scoring).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(target: str, dataset_id, fingerprint: str, config: dict, seed: int, budget: float = None):
+        config = {k: v.item() if isinstance(v, np.generic) else v for k, v in dict(config).items()}
+        identity = [target, str(dataset_id), fingerprint, config, int(seed)]
+        if budget is not None:
+            identity.append(float(budget))
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+    def wrap(self, evaluate, target, dataset, train_test_splits, scoring, progress, loop_iterations):
+        fingerprint = self.fingerprint(dataset, train_test_splits, scoring)
+        return CachedEvaluator(self, evaluate, target.name, dataset.metadata.id, fingerprint, progress,
+                               loop_iterations)
+
+
+class CachedEvaluator:
+
+    def __init__(self, cache: EvaluationCache, evaluate, target, dataset_id, fingerprint, progress, loop_iterations):
+        self.cache = cache
+        self.evaluate = evaluate
+        self.target = target
+        self.dataset_id = dataset_id
+        self.fingerprint = fingerprint
+        self.progress = progress
+        self.loop_iterations = loop_iterations
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, config, seed, budget=None, cap=None):
+        budget = budget or None  # Optimizers without fidelities pass a budget of 0
+        key = self.cache.key(self.target, self.dataset_id, self.fingerprint, config, seed, budget)
+        loss = self.cache.get(key)
+
+        if loss is not None:
+            self.hits += 1
+            self.progress.update(self.loop_iterations, advance=1 if budget is None else min(budget, 1))
+            return loss
+
+        self.misses += 1
+        loss = self.evaluate(config, seed) if budget is None and cap is None else \
+            self.evaluate(config, seed, budget, cap=cap)
+        if not isinstance(loss, tuple):  # Capped evaluations did not run all folds
+            self.cache.put(key, loss)
+        return loss
+
+    def prefetch(self, runs):
+        # Runs that are in the cache do not need to be evaluated ahead. An empty batch is passed on as well, so that
+        # the evaluator can drop the runs of the previous batch.
+        keys = {run: self.cache.key(self.target, self.dataset_id, self.fingerprint, *run) for run in runs}
+        missing = [run for run in runs if self.cache.get(keys[run]) is None]
+        if hasattr(self.evaluate, "prefetch"):
+            self.evaluate.prefetch(missing)
+
+    def get_stats(self):
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses
+        }
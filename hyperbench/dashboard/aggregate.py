@@ -1,5 +1,3 @@
-import json
-import os
 import re
 from datetime import timedelta
 from functools import reduce
@@ -7,84 +5,113 @@ from functools import reduce
 import numpy as np
 import pandas as pd
 import plotly.express as px
+import streamlit as st
 
 from hyperbench.dashboard.options import Options, Views
+from hyperbench.dashboard.scores import GroupScores, zscores, average_ranks
+from hyperbench.results import open_results, ResultsIndex
 from hyperbench.trajectory.trajectory import Trajectory
 
+# Streamlit versions before 1.18 only have the experimental names of the caching decorators
+cache_data = getattr(st, "cache_data", None) or st.experimental_memo
+cache_resource = getattr(st, "cache_resource", None) or st.experimental_singleton
 
-def get_trajectories(path, iterations, time_based, details):
+
+# Kept between reruns of the dashboard, so that only the datasets with new runs are scored again
+dataset_zscores = GroupScores(zscores)
+dataset_ranks = GroupScores(average_ranks)
+
+# Columns that describe a row of the trajectory frame, the other columns hold the loss at every budget step
+INDEX_COLUMNS = ["optimizer", "seed", "dataset", "stage", "virtual"]
+
+
+def get_details(details):
     entries = []
 
     details = details[1:]  # Skip target
     optimizer = details[0]
     multiplier = get_multiplier(optimizer)
 
-    # Get trajectory for all multipliers
+    # One row for every multiplier
     for i in range(multiplier):
         speedup = i + 1
         if 1 < multiplier != speedup:
             details[0] = optimizer.split("_")[0] + f"_x{speedup}"
         else:
             details[0] = optimizer
-        _, y = Trajectory.load(path).get_loss(iterations, time_based, speedup=speedup)
 
         virtual = speedup != multiplier
-        entries.append([*details, virtual, y])
+        entries.append([*details, virtual])
 
     return entries
 
 
-def get_max_iterations(directory, filter_by_target):
-    max_iter = 0
-    max_time = 0
-    for currentpath, folders, files in os.walk(directory):
-        for file in files:
+def get_trajectory_frame(loaded, maximum, time_based):
+    # The rows of a trajectory are consecutive, one for every multiplier. The iterations of multi-fidelity optimizers
+    # are counted in full evaluations.
+    multipliers = np.array([get_multiplier(details[1]) for details, _ in loaded], dtype=int)
+    offsets = np.concatenate([[0], np.cumsum(multipliers)])[:-1]
 
-            if not file.endswith("search.json"):
-                continue
+    x, _ = Trajectory.get_losses([], maximum, time_based)
+    values = np.empty((multipliers.sum(), len(x)), dtype=np.float32)
+    for speedup in range(1, multipliers.max(initial=0) + 1):
+        selected = np.flatnonzero(multipliers >= speedup)
+        _, y = Trajectory.get_losses([loaded[i][1] for i in selected], maximum, time_based, speedup=speedup,
+                                     cost_based=True)
+        values[offsets[selected] + speedup - 1] = y
 
-            path = os.path.join(currentpath, file)
-            details = path.replace(".json", "").split("/")[-5:]
-            target, optimizer, seed, dataset, stage = details
+    index = pd.DataFrame([row for details, _ in loaded for row in get_details(details)], columns=INDEX_COLUMNS)
+    index = index.astype({"optimizer": "category", "seed": "category", "dataset": "category", "stage": "category",
+                          "virtual": bool})
+    return pd.concat([index, pd.DataFrame(values)], axis=1, copy=False)
 
-            if not (target == filter_by_target):
-                continue
 
-            multiplier = get_multiplier(optimizer)
-            max_iter = max(max_iter, Trajectory.load(path).max_iter / multiplier)
-            max_time = max(max_time, Trajectory.load(path).max_time / multiplier)
+def get_max_iterations(loaded):
+    max_iter = 0
+    max_time = 0
+    for details, trajectory in loaded:
+        target, optimizer, seed, dataset, stage = details
+
+        if not stage == "search":
+            continue
+
+        multiplier = get_multiplier(optimizer)
+        max_iter = max(max_iter, trajectory.max_cost / multiplier)
+        max_time = max(max_time, trajectory.max_time / multiplier)
     return max_iter, max_time
 
 
-def load_trajectories(o: Options):
-    directory, time_based, filter_by_target = o.directory, o.time_based, o.target
-    trajectories = []
+@cache_resource(show_spinner=False)
+def get_index(directory):
+    # One index per results location, shared by all sessions of the dashboard
+    return ResultsIndex.open(directory)
 
-    max_iter, max_time = get_max_iterations(directory, o.target)
-    maximum = max_time if time_based else max_iter
 
-    for currentpath, folders, files in os.walk(directory):
-        for file in files:
+def load_results(directory, target):
+    # All indexed trajectories of the target algorithm, together with their details
+    return [
+        ([target, optimizer, seed, dataset, stage], trajectory)
+        for optimizer, seed, dataset, stage, trajectory in get_index(directory).load_trajectories(target)
+    ]
 
-            if not (file.endswith("search.json") or file.endswith("eval.json")):
-                continue
 
-            path = os.path.join(currentpath, file)
-            details = path.replace(".json", "").split("/")[-5:]
-            target, optimizer, seed, dataset, stage = details
+def load_trajectories(o: Options):
+    # Only new or changed results are read, and the frame is only rebuilt when the results have changed
+    signature = get_index(o.directory).update(o.target)
+    return build_trajectories(o.directory, o.target, o.time_based, o.view, signature)
 
-            if not (target == filter_by_target):
-                continue
 
-            for trajectory in get_trajectories(path, maximum, time_based, details):
-                trajectories.append(trajectory)
+@cache_data(show_spinner=False, max_entries=32)
+def build_trajectories(directory, target, time_based, view, signature):
+    loaded = load_results(directory, target)
+    max_iter, max_time = get_max_iterations(loaded)
+    maximum = max_time if time_based else max_iter
 
-    df = pd.DataFrame(trajectories, columns=["optimizer", "seed", "dataset", "stage", "virtual", "trajectory"])
-    expanded = pd.concat([df.drop('trajectory', axis=1), df['trajectory'].apply(pd.Series)], axis=1)
+    expanded = get_trajectory_frame(loaded, maximum, time_based)
 
-    if o.view == Views.LIVE:
+    if view == Views.LIVE:
         expanded = live_view(expanded)
-    elif o.view == Views.STATIC:
+    elif view == Views.STATIC:
         expanded = static_view(expanded)
 
     return expanded
@@ -94,13 +121,15 @@ def load_stats(directory, dataframe, target):
     indices = dataframe[["optimizer", "seed", "dataset", "virtual"]].copy()
     indices = indices[~indices.virtual]
     indices.loc[:, "target"] = target
+    stats = {
+        (optimizer, seed, dataset): row
+        for optimizer, seed, dataset, row in open_results(directory).load_stats(target)
+    }
     rows = []
     for index in indices.iloc:
-        path = os.path.join(directory, index.target, index.optimizer, index.seed, index.dataset, "stats.json")
-        with open(path, "r") as f:
-            row = json.load(f)
-            row = {**index, **row}
-            rows.append(row)
+        row = stats[index.optimizer, index.seed, index.dataset]
+        row = {**index, **row}
+        rows.append(row)
     frame = pd.DataFrame(rows)
     frame['epm_time_used'] = frame['wallclock_time_used'] - frame['ta_time_used']
     return frame
@@ -138,6 +167,29 @@ def get_other_stats(df):
         .agg(lambda x: f"{np.mean(x):.2f} ± {np.std(x):.2f}")
 
 
+def get_profile_stats(df):
+    # Mean wall-clock and CPU time per section of the experiments that were profiled, in seconds
+    if "profile" not in df.columns:
+        return None
+    rows = [
+        {"optimizer": optimizer, "section": section, **times}
+        for optimizer, profile in zip(df.optimizer, df.profile) if isinstance(profile, dict)
+        for section, times in profile["sections"].items()
+    ]
+    frame = pd.DataFrame(rows)
+    frame["cpu"] = frame["cpu"].astype(float)
+    stats = frame.groupby(["optimizer", "section"])[["count", "wall", "cpu"]].mean().round(2)
+    return stats.rename(columns={"wall": "wall time (s)", "cpu": "CPU time (s)"})
+
+
+def get_memory_stats(df):
+    if "profile" not in df.columns:
+        return None
+    profiled = df[df.profile.apply(lambda profile: isinstance(profile, dict))]
+    peak = profiled.profile.apply(lambda profile: profile["peak_rss"] / 2 ** 20)
+    return peak.groupby(profiled.optimizer).agg(["mean", "max"]).round(1).add_prefix("peak RSS (MiB) ")
+
+
 def filter_on(dataframe, **kwargs):
     res = dataframe.copy()
     for k, v in kwargs.items():
@@ -147,7 +199,7 @@ def filter_on(dataframe, **kwargs):
 
 
 def live_view(dataframe):
-    datasets_per_group = list(dataframe.groupby(["optimizer", "seed", "stage"])["dataset"].agg(list)
+    datasets_per_group = list(dataframe.groupby(["optimizer", "seed", "stage"], observed=True)["dataset"].agg(list)
                               .reset_index(drop=True).to_dict().values())
     common_datasets = reduce(np.intersect1d, datasets_per_group)
     return dataframe[dataframe["dataset"].isin(common_datasets)]
@@ -155,43 +207,92 @@ def live_view(dataframe):
 
 def static_view(dataframe):
     indexed = dataframe.set_index(["optimizer", "seed"])
-    counts = filter_on(indexed, stage="eval").groupby(["optimizer", "seed"]).dataset.count()
+    counts = filter_on(indexed, stage="eval").groupby(["optimizer", "seed"], observed=True).dataset.count()
     filtered = indexed[counts == counts.max()]
     return filtered.reset_index()
 
 
 def get_target_algorithms(directory):
-    return [f for f in os.listdir(directory) if not f.startswith(".")]
+    return open_results(directory).targets()
 
 
 def get_datasets(dataframe):
-    return dataframe.dataset.unique()
+    return np.asarray(dataframe.dataset.unique())
 
 
 def overview(dataframe):
     filtered = filter_on(dataframe, stage="eval")
     return filtered.set_index(["optimizer", "seed"])["dataset"] \
-        .groupby(["optimizer", "seed"]).count().reset_index().rename({"dataset": "datasets"}, axis=1)
+        .groupby(["optimizer", "seed"], observed=True).count().reset_index().rename({"dataset": "datasets"}, axis=1)
+
+
+def split_frame(dataframe):
+    # Separates the columns that describe the rows from the losses
+    columns = [c for c in dataframe.columns if c in INDEX_COLUMNS]
+    return dataframe[columns].reset_index(drop=True), dataframe.drop(columns, axis=1)
+
+
+def group_codes(index, keys):
+    # Numbers the groups in the sorted order of their keys, like a groupby does
+    codes = np.zeros(len(index), dtype=np.int64)
+    for key in keys:
+        key_codes, uniques = pd.factorize(np.asarray(index[key], dtype=object), sort=True)
+        codes = codes * len(uniques) + key_codes
+    groups, codes = np.unique(codes, return_inverse=True)
+    return codes.reshape(-1), len(groups)
+
+
+def group_sums(values, codes, n_groups):
+    # Sums of the rows per group, using one reduction over the rows sorted by group
+    if n_groups == 0:
+        return np.zeros((0, *values.shape[1:]))
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(n_groups))
+    return np.add.reduceat(values[order], starts, axis=0)
+
+
+def group_means(values, codes, n_groups):
+    # Means per group that skip missing values, like pandas does
+    missing = np.isnan(values)
+    counts = group_sums((~missing).astype(np.float64), codes, n_groups)
+    sums = group_sums(np.where(missing, 0, values).astype(np.float64), codes, n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan), counts
 
 
 def normalize(dataframe):
-    return dataframe.set_index(["optimizer", "dataset", "seed"]).groupby(["dataset"]) \
-        .transform(lambda x: (x - x.mean()) / x.std()).reset_index()
+    index, losses = split_frame(dataframe)
+    normalized = dataset_zscores(losses.to_numpy(dtype=np.float64), index["dataset"])
+    return pd.concat([index[["optimizer", "dataset", "seed"]],
+                      pd.DataFrame(normalized.astype(np.float32), columns=losses.columns)], axis=1)
 
 
 def rank(dataframe):
-    return dataframe.set_index(['optimizer', 'seed', 'dataset']).groupby(['dataset']).rank(axis=0) \
-        .reset_index()
+    index, losses = split_frame(dataframe)
+    ranks = dataset_ranks(losses.to_numpy(dtype=np.float64), index["dataset"])
+    return pd.concat([index[["optimizer", "seed", "dataset"]],
+                      pd.DataFrame(ranks.astype(np.float32), columns=losses.columns)], axis=1)
+
+
+def aggregate_over(dataframe, keys):
+    index, losses = split_frame(dataframe)
+    codes, n_groups = group_codes(index, keys)
+    means, _ = group_means(losses.to_numpy(dtype=np.float64), codes, n_groups)
+
+    first = np.zeros(n_groups, dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes))[::-1]
+    groups = index.loc[first, keys].astype(object).reset_index(drop=True)
+    return pd.concat([groups, pd.DataFrame(means.astype(np.float32), columns=losses.columns)], axis=1)
 
 
 def aggregate_over_seeds(dataframe):
     # Needs dataframe with columns optimizer, dataset, seed, *trajectory
-    return dataframe.groupby(['optimizer', 'dataset']).mean(numeric_only=True).reset_index()
+    return aggregate_over(dataframe, ['optimizer', 'dataset'])
 
 
 def aggregate_over_datasets(dataframe):
     # Needs dataframe with columns optimizer, dataset, *trajectory
-    return dataframe.groupby(['optimizer']).mean(numeric_only=True).reset_index()
+    return aggregate_over(dataframe, ['optimizer'])
 
 
 def visualize(dataframe):
@@ -15,3 +15,9 @@ def display(directory, filtered, target):
 
     with st.expander("Miscellaneous statistics", expanded=True):
         st.dataframe(aggregate.get_other_stats(stats), use_container_width=True)
+
+    profile = aggregate.get_profile_stats(stats)
+    if profile is not None:
+        with st.expander("Time breakdown of profiled experiments", expanded=True):
+            st.dataframe(profile, use_container_width=True)
+            st.dataframe(aggregate.get_memory_stats(stats), use_container_width=True)
@@ -1 +1,3 @@
-from .dataset import Dataset
\ No newline at end of file
+from .dataset import Dataset
+from .store import DatasetStore
+from .split_cache import SplitCache
@@ -16,4 +16,14 @@ class Dataset:
             yield self.select(i)
 
     def select(self, indices):
+        indices = self.as_slice(indices)
         return dataclasses.replace(self, X=self.X[indices], y=self.y[indices])
+
+    @staticmethod
+    def as_slice(indices):
+        # A contiguous range of indices selects a view instead of a copy
+        array = np.asarray(indices)
+        if array.ndim == 1 and array.dtype.kind in "iu" and len(array) > 0 and array[0] >= 0 \
+                and (len(array) == 1 or (np.diff(array) == 1).all()):
+            return slice(int(array[0]), int(array[-1]) + 1)
+        return indices
@@ -0,0 +1,74 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from hyperbench.dataset.dataset import Dataset
+from hyperbench.dataset.store import DatasetStore
+
+
+class SplitCache:
+    """
+    Keeps the search and evaluation sets of a split after they have been transformed, so that every split is only
+    selected and transformed once per dataset, instead of once per seed, target algorithm and optimizer. The sets are
+    kept in memory, up to `max_bytes`, and removed when they are the least recently used. When a `store` is given, the
+    sets are also saved in it, so that reruns and the workers of the parallel runner open them as read-only memory maps
+    instead of transforming them again.
+    """
+
+    def __init__(self, max_bytes: int = 2 ** 30, store: DatasetStore = None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self.n_bytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(dataset: Dataset, search_indices, eval_indices, transformer) -> str:
+        # The dataset is identified by its contents, so that a changed file is transformed again, and by the columns
+        # that the transformer treats as categorical or numeric. The transformer by its class and its attributes.
+        digest = hashlib.sha256()
+        digest.update(f"{dataset.metadata.id}-{dataset.metadata.name}-{dataset.X.shape}-{dataset.X.dtype}".encode())
+        digest.update(np.ascontiguousarray(dataset.X).tobytes())
+        digest.update(np.ascontiguousarray(dataset.y).tobytes())
+        digest.update(repr((list(dataset.metadata.categorical), list(dataset.metadata.numeric))).encode())
+        digest.update(np.ascontiguousarray(search_indices).tobytes())
+        digest.update(np.ascontiguousarray(eval_indices).tobytes())
+        digest.update(f"{type(transformer).__module__}.{type(transformer).__qualname__}".encode())
+        digest.update(repr(sorted(vars(transformer).items())).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def size(sets) -> int:
+        return sum(s.X.nbytes + s.y.nbytes for s in sets)
+
+    def get(self, dataset: Dataset, search_indices, eval_indices, transformer):
+        key = self.key(dataset, search_indices, eval_indices, transformer)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+
+        if self.store is not None and self.store.contains(f"{key}-eval"):
+            sets = self.store.load(f"{key}-search"), self.store.load(f"{key}-eval")
+        else:
+            sets = transformer.transform(*dataset.split(search_indices, eval_indices))
+            if self.store is not None:
+                self.store.save(f"{key}-search", sets[0])
+                self.store.save(f"{key}-eval", sets[1])
+
+        # The sets are shared by all optimizers, so none of them may change them
+        for s in sets:
+            if isinstance(s.X, np.ndarray):
+                s.X.setflags(write=False)
+            s.y.setflags(write=False)
+
+        if self.size(sets) <= self.max_bytes:
+            self.entries[key] = sets
+            self.n_bytes += self.size(sets)
+            while self.n_bytes > self.max_bytes:
+                _, removed = self.entries.popitem(last=False)
+                self.n_bytes -= self.size(removed)
+        return sets
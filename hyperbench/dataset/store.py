@@ -0,0 +1,75 @@
+import dataclasses
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from hyperbench.dataset.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
+
+
+class DatasetStore:
+    """
+    Keeps datasets in a local folder, with X and y as .npy files and the metadata in a JSON file. The arrays are opened
+    as read-only memory maps, so that processes that use the same dataset share its pages instead of each holding a
+    private copy. Once a dataset has been stored, it can be loaded without a network connection.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, str(key))
+
+    def contains(self, key):
+        return os.path.exists(os.path.join(self.path(key), "metadata.json"))
+
+    def save(self, key, dataset: Dataset, **info):
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write to a temporary folder first, so that other processes never see a half-written dataset
+        folder = tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory)
+        np.save(os.path.join(folder, "X.npy"), dataset.X)
+        np.save(os.path.join(folder, "y.npy"), dataset.y)
+        with open(os.path.join(folder, "metadata.json"), "w+") as f:
+            json.dump({"metadata": dataclasses.asdict(dataset.metadata), "info": info}, f, indent=2, default=_builtin)
+
+        try:
+            os.rename(folder, self.path(key))
+        except OSError:
+            # Another process stored the same dataset in the meantime
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def load(self, key) -> Dataset:
+        X = self.load_array(key, "X")
+        y = self.load_array(key, "y")
+        return Dataset(X, y, self.load_metadata(key))
+
+    def load_array(self, key, name):
+        file = os.path.join(self.path(key), f"{name}.npy")
+        try:
+            return np.load(file, mmap_mode="r")
+        except ValueError:
+            # Arrays with Python objects can not be memory-mapped
+            return np.load(file, allow_pickle=True)
+
+    def load_metadata(self, key) -> Metadata:
+        return Metadata(**self._read(key)["metadata"])
+
+    def load_info(self, key) -> dict:
+        return self._read(key)["info"]
+
+    def _read(self, key):
+        with open(os.path.join(self.path(key), "metadata.json"), "r") as f:
+            return json.load(f)
+
+
+def _builtin(value):
+    # Converts NumPy scalars and arrays in the metadata to JSON serializable values
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
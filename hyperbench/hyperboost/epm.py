@@ -31,6 +31,22 @@ class HyperboostEPM(BaseEPM):
         Number of components to keep when using PCA to reduce
         dimensionality of instance features. Requires to
         set n_feats (> pca_dims).
+    warm_start : bool
+        If set, the model continues boosting from the previous model when
+        only a few configurations were added since the last training,
+        instead of training a new model on all data.
+    warm_iterations : int
+        Number of trees that are added to the previous model when it is
+        warm-started.
+    max_new_rows : int
+        Maximum number of configurations that may be added since the last
+        training for the model to be warm-started.
+    refit_interval : int
+        Number of warm-started trainings after which a new model is
+        trained on all data.
+    predict_chunk_size : int
+        Maximum number of configurations that are predicted at once, which
+        bounds the memory used for predicting many candidates.
     """
 
     def __init__(
@@ -41,6 +57,11 @@ class HyperboostEPM(BaseEPM):
             seed: int,
             instance_features: Optional[np.ndarray] = None,
             pca_components: Optional[int] = None,
+            warm_start: bool = False,
+            warm_iterations: int = 10,
+            max_new_rows: int = 5,
+            refit_interval: int = 10,
+            predict_chunk_size: int = 10_000,
     ) -> None:
         super().__init__(
             configspace=configspace,
@@ -51,6 +72,14 @@ class HyperboostEPM(BaseEPM):
             pca_components=pca_components,
         )
         self.rng = np.random.RandomState(self.seed)
+        self.warm_start = warm_start
+        self.warm_iterations = warm_iterations
+        self.max_new_rows = max_new_rows
+        self.refit_interval = refit_interval
+        self.predict_chunk_size = predict_chunk_size
+        self.catboost = None
+        self.n_rows = 0  # Number of rows the current model was trained on
+        self.n_warm_starts = 0  # Number of warm-started trainings since the last full training
 
         return None
 
@@ -71,6 +100,21 @@ class HyperboostEPM(BaseEPM):
         if not isinstance(Y, np.ndarray):
             raise NotImplementedError("Y has to be of type np.ndarray")
 
+        if self.can_warm_start(X):
+            try:
+                catboost = CatBoostRegressor(iterations=self.warm_iterations, loss_function="RMSEWithUncertainty",
+                                             posterior_sampling=False,
+                                             verbose=False, random_seed=0, learning_rate=1.0, random_strength=0,
+                                             l2_leaf_reg=1)
+                catboost.fit(X, Y, init_model=self.catboost)
+                self.catboost = catboost
+                self.n_rows = X.shape[0]
+                self.n_warm_starts += 1
+                self.logger.debug("Continued fitting model to data")
+                return self
+            except Exception as e:
+                self.logger.warning(f"Warm start failed, fitting a new model: {e!r}")
+
         try:
             self.catboost = CatBoostRegressor(iterations=100, loss_function="RMSEWithUncertainty",
                                               posterior_sampling=False,
@@ -90,9 +134,16 @@ class HyperboostEPM(BaseEPM):
                                                   l2_leaf_reg=1, subsample=1.0)
                 self.catboost.fit(X, Y)
 
+        self.n_rows = X.shape[0]
+        self.n_warm_starts = 0
         self.logger.debug("Fit model to data")
         return self
 
+    def can_warm_start(self, X: np.ndarray) -> bool:
+        # Continuing from the previous model is only worthwhile if it was trained on most of the data
+        return self.warm_start and self.catboost is not None and self.n_warm_starts < self.refit_interval \
+            and 0 <= X.shape[0] - self.n_rows <= self.max_new_rows
+
     def _predict(self, X: np.ndarray, cov_return_type: Optional[str] = "diagonal_cov") -> Tuple[np.ndarray, np.ndarray]:
         """Predict means and variances for given X.
 
@@ -116,26 +167,23 @@ class HyperboostEPM(BaseEPM):
         if not isinstance(X, np.ndarray):
             raise NotImplementedError("X has to be of type np.ndarray")
 
-        pred = self.catboost.predict(X)
-
-        # Tree count should usually be 100, but in rare cases it gets lower due to pruning. In that case we need to
-        # adjust the number of virtual ensembles we use.
-        max_virtual_ensembles = int(self.catboost.tree_count_ / 2)
+        # Tree count should usually be 100, but in rare cases it gets lower due to pruning. Every virtual ensemble needs
+        # at least two trees.
+        n_virtual_ensembles = min(20, self.catboost.tree_count_ // 2)
 
-        preds = self.virtual_ensemble_predict(X, min(20, max_virtual_ensembles))
+        means = np.empty(X.shape[0])
+        knowledge = np.empty(X.shape[0])  # knowledge uncertainty predicted by a virtual ensemble
+        for start in range(0, X.shape[0], self.predict_chunk_size):
+            chunk = slice(start, start + self.predict_chunk_size)
+            means[chunk], knowledge[chunk] = self.virtual_ensemble_predict(X[chunk], n_virtual_ensembles)
 
-        mean_preds = preds[:, 0]  # mean values predicted by a virtual ensemble
-        knowledge = preds[:, 1]  # knowledge uncertainty predicted by a virtual ensemble
-        data = preds[:, 2]  # average estimated data uncertainty
-
-        return pred[:, 0], knowledge ** 0.3
+        return means, knowledge ** 0.3
 
     def virtual_ensemble_predict(self, X, n):
+        if n == 0:
+            # Too few trees for a virtual ensemble, so there is no estimate of the knowledge uncertainty
+            return self.catboost.predict(X)[:, 0], np.zeros(X.shape[0])
 
-        # Probably no longer necessary to wrap these into try/except.
-        try:
-            return self.catboost.virtual_ensembles_predict(X, prediction_type="TotalUncertainty",
-                                                           virtual_ensembles_count=n)
-        except:
-            print(f"WARNING: Reducing number of virtual ensembles to {n - 1}")
-            return self.virtual_ensemble_predict(X, n - 1)
+        preds = self.catboost.virtual_ensembles_predict(X, prediction_type="TotalUncertainty",
+                                                        virtual_ensembles_count=n)
+        return preds[:, 0], preds[:, 1]  # mean values and knowledge uncertainty
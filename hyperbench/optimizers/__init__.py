@@ -1,2 +1,3 @@
 from .base import Optimizer
-from .smac_based import SMACBasedOptimizer
\ No newline at end of file
+from .smac_based import SMACBasedOptimizer
+from .multi_fidelity import MultiFidelityOptimizer
@@ -35,3 +35,7 @@ class Optimizer(ABC):
     @abstractmethod
     def get_stats(self) -> dict:
         pass
+
+    def profile(self, profiler):
+        # Optimizers that can record the time of their own sections, e.g. of their model, override this
+        pass
@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+from smac.configspace import convert_configurations_to_array
+
+
+class BatchProposer:
+    """
+    Lets a SMAC optimizer propose `batch_size` configurations at once, which are then evaluated concurrently. The batch
+    is chosen with the constant liar strategy: after each proposal, the model is trained again as if the proposed
+    configuration had the lowest cost observed so far, so that the next proposal is made elsewhere. The acquisition
+    function is only maximized for the first proposal. The next proposals are chosen from the best `n_candidates` of
+    that maximization, ranked again with the model that was trained with the lies.
+
+    The proposals are handed to the intensifier before the regular challengers, so that the racing of challengers
+    against the incumbent is unchanged. Their runs on the seeds of the incumbent are evaluated ahead of time through
+    the `prefetch` method of the evaluator, and are counted as iterations only when the intensifier requests them.
+    Their time is charged to the target algorithm time of SMAC when they are prefetched, as SMAC only measures the
+    requests, which return at once.
+    """
+
+    def __init__(self, smac, evaluator, batch_size: int, n_candidates: int = 100):
+        self.solver = smac.solver
+        self.chooser = self.solver.epm_chooser
+        self.evaluator = evaluator
+        self.batch_size = batch_size
+        self.n_candidates = max(n_candidates, batch_size)
+        self.proposals = []  # Proposed configurations that were not handed to the intensifier yet
+        self.n_batches = 0
+        self.prefetch_time = 0.0
+
+        self.choose_next = self.chooser.choose_next
+        self.chooser.choose_next = self.next_challengers
+
+    def next_challengers(self, incumbent_value: float = None):
+        if not self.proposals:
+            self.proposals = self.propose()
+            self.prefetch(self.proposals)
+            self.n_batches += 1
+
+        while self.proposals:
+            yield self.proposals.pop(0)
+        yield from self.choose_next(incumbent_value)
+
+    def propose(self):
+        runhistory = self.solver.runhistory
+        candidates = []
+        for config in self.choose_next():
+            if config not in runhistory.config_ids and config not in candidates:
+                candidates.append(config)
+                if len(candidates) == self.n_candidates:
+                    break
+
+        X, Y, _ = self.chooser._collect_data_to_train_model()
+        if X.shape[0] == 0:
+            # Without data the candidates are random, so there is nothing to rank
+            return candidates[:self.batch_size]
+
+        batch = candidates[:1]
+        while len(batch) < min(self.batch_size, len(candidates)):
+            # The acquisition function uses the same model, so it follows the training with the lies
+            lies = np.full((len(batch), Y.shape[1]), np.min(Y))
+            self.chooser.model.train(np.vstack([X, convert_configurations_to_array(batch)]), np.vstack([Y, lies]))
+            remaining = [config for config in candidates if config not in batch]
+            batch.append(remaining[int(np.argmax(self.chooser.acquisition_func(remaining)))])
+        return batch
+
+    def prefetch(self, configs):
+        incumbent = self.solver.incumbent
+        if incumbent is None or not hasattr(self.evaluator, "prefetch"):
+            return
+        runs = self.solver.runhistory.get_runs_for_config(incumbent, only_max_observed_budget=True)
+        seeds = [key.seed for key in runs]
+        tic = time.perf_counter()
+        self.evaluator.prefetch([(config, seed) for config in configs for seed in seeds])
+        elapsed = time.perf_counter() - tic
+        self.solver.stats.ta_time_used += elapsed
+        self.prefetch_time += elapsed
@@ -0,0 +1,27 @@
+import numpy as np
+from scipy import stats
+
+
+class AdaptiveCap:
+    """
+    Decides whether the evaluation of a challenger can stop before all folds are done, because it can no longer beat
+    the loss of the incumbent (`threshold`). That is the case when the mean loss is above the threshold even if the
+    remaining folds have no loss at all, or when the lower confidence bound of the mean loss of the folds so far is
+    above the threshold.
+    """
+
+    def __init__(self, threshold: float, confidence: float = 0.95):
+        self.threshold = threshold
+        self.confidence = confidence
+
+    def __call__(self, losses, n_folds: int) -> bool:
+        losses = np.asarray(losses, dtype=float)
+        if np.isnan(losses).any():
+            return False
+        if losses.sum() / n_folds > self.threshold:
+            return True
+        if len(losses) < 2:
+            return False
+
+        margin = stats.t.ppf(self.confidence, len(losses) - 1) * losses.std(ddof=1) / np.sqrt(len(losses))
+        return losses.mean() - margin > self.threshold
@@ -0,0 +1,64 @@
+import dataclasses
+
+from smac.callbacks import IncorporateRunResultCallback
+from smac.facade.smac_mf_facade import SMAC4MF
+
+from hyperbench.optimizers.smac_based import SMACBasedOptimizer
+from hyperbench.trajectory.entry import Entry
+
+
+class MultiFidelityOptimizer(SMACBasedOptimizer):
+    """
+    Runs a multi-fidelity SMAC facade, by default SMAC4MF (BOHB), which races configurations with successive halving
+    and only evaluates the promising ones on the full budget. The budget that is passed to the evaluator is the
+    fraction of a full evaluation, from `min_budget` to 1. The target algorithm uses it to scale its
+    `fidelity_parameter` (e.g. the number of trees), or else to subsample the training folds.
+
+    The budget of the benchmark is counted in full evaluations, so the search stops when the evaluations together cost
+    as much as `budget` full evaluations. The trajectory records the fidelity of every incumbent and the cost at which
+    it was found.
+    """
+
+    def __init__(self, optimizer=SMAC4MF, name="smac-mf", budget_multiplier=1, min_budget=1 / 9, eta=3, **kwargs):
+        intensifier_kwargs = {"initial_budget": min_budget, "max_budget": 1, "eta": eta,
+                              **kwargs.pop("intensifier_kwargs", {})}
+        super().__init__(optimizer, name, budget_multiplier, intensifier_kwargs=intensifier_kwargs, **kwargs)
+        self.cost_limit = None
+
+    def initialize(self, tae_runner, seed, data, budget, time_based, target_algorithm):
+        super().initialize(tae_runner, seed, data, budget, time_based, target_algorithm)
+        self.cost_limit = CostLimit(budget * self.budget_multiplier if not time_based else float("inf"))
+        self.initialized_optimizer.register_callback(self.cost_limit)
+        return self
+
+    def scenario(self, seed, data, budget, time_based, target_algorithm):
+        # The number of runs is not limited, because runs on a lower budget cost less
+        return {**super().scenario(seed, data, budget, time_based, target_algorithm), "ta_run_limit": "inf"}
+
+    def get_entry(self, entry, config_id_to_seeds) -> Entry:
+        costs = self.cost_limit.costs
+        return dataclasses.replace(super().get_entry(entry, config_id_to_seeds), budget=float(entry.budget),
+                                   at_cost=costs[entry.ta_runs - 1] if entry.ta_runs > 0 else 0.)
+
+    def get_seeds(self, entry, config_id_to_seeds):
+        # The incumbent may also have been evaluated on lower budgets, but only the runs on its own budget count
+        runhistory = self.initialized_optimizer.runhistory
+        config_id = runhistory.config_ids[entry.incumbent]
+        return [key.seed for key in runhistory.data if key.config_id == config_id and key.budget == entry.budget]
+
+    def get_stats(self):
+        return {**super().get_stats(), "total_cost": self.cost_limit.costs[-1] if self.cost_limit.costs else 0.}
+
+
+class CostLimit(IncorporateRunResultCallback):
+    """Keeps track of the total cost of the runs, in full evaluations, and stops the search at the limit."""
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.costs = []  # The total cost after every finished run
+
+    def __call__(self, smbo, run_info, result, time_left):
+        total = (self.costs[-1] if self.costs else 0.) + min(run_info.budget or 1, 1)
+        self.costs.append(total)
+        if total >= self.limit:
+            return False
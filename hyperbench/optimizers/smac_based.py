@@ -2,21 +2,30 @@ from collections import defaultdict
 
 import numpy as np
 from ConfigSpace import Configuration
+from smac.runhistory.runhistory import RunKey
 from smac.scenario.scenario import Scenario
 
 from hyperbench.optimizers.base import Optimizer
+from hyperbench.optimizers.batch import BatchProposer
+from hyperbench.optimizers.capping import AdaptiveCap
+from hyperbench.resources import Profiler
+from hyperbench.results.journal import JournaledEvaluator
 from hyperbench.trajectory.entry import Entry
 from hyperbench.trajectory.trajectory import Trajectory
 
 
 class SMACBasedOptimizer(Optimizer):
 
-    def __init__(self, optimizer, name, budget_multiplier=1, **kwargs):
+    def __init__(self, optimizer, name, budget_multiplier=1, batch_size=1, capping=None, **kwargs):
         self.optimizer = optimizer
         self._name = name + f"_x{budget_multiplier}" if budget_multiplier > 1 else name
         self.kwargs = kwargs
         self.initialized_optimizer = None
         self.budget_multiplier = budget_multiplier
+        self.batch_size = batch_size  # Number of configurations that are proposed and evaluated at once
+        self.batch_proposer = None
+        self.capping = capping  # Confidence of the bound that stops the evaluation of a challenger early, or None
+        self.n_capped = 0
 
     @property
     def name(self):
@@ -24,7 +33,21 @@ class SMACBasedOptimizer(Optimizer):
 
     def initialize(self, tae_runner, seed, data, budget, time_based, target_algorithm):
         rng = np.random.RandomState(seed)
-        scenario = Scenario({
+        scenario = Scenario(self.scenario(seed, data, budget, time_based, target_algorithm))
+
+        evaluator = tae_runner
+        if self.capping is not None:
+            tae_runner = self.cap_evaluations(evaluator)
+
+        self.initialized_optimizer = self.optimizer(scenario=scenario, rng=rng, tae_runner=tae_runner, **self.kwargs)
+        if self.batch_size > 1:
+            self.batch_proposer = BatchProposer(self.initialized_optimizer, evaluator, self.batch_size)
+        if isinstance(evaluator, JournaledEvaluator):
+            self.follow_journal(evaluator)
+        return self
+
+    def scenario(self, seed, data, budget, time_based, target_algorithm) -> dict:
+        return {
             "run_obj": "quality",
             "ta_run_limit": budget * self.budget_multiplier if not time_based else "inf",
             "wallclock_limit": budget * self.budget_multiplier if time_based else "inf",
@@ -33,10 +56,67 @@ class SMACBasedOptimizer(Optimizer):
             "maxR": 5,
             "output_dir": f"./smac_output/{target_algorithm.name}/{self.name}/{seed}/{data.metadata.name}",
             "intens_min_chall": 2,
-        })
+        }
 
-        self.initialized_optimizer = self.optimizer(scenario=scenario, rng=rng, tae_runner=tae_runner, **self.kwargs)
-        return self
+    def cap_evaluations(self, evaluate):
+        self.n_capped = 0
+
+        def capped(config, seed, budget=None):
+            threshold = self.incumbent_loss(config, seed)
+            result = evaluate(config, seed, budget, cap=AdaptiveCap(threshold, self.capping)) \
+                if threshold is not None else evaluate(config, seed, budget)
+            if isinstance(result, tuple):
+                # The mean loss of the folds that were run is only an estimate, so the run is reported with a censored
+                # loss: at least the threshold it was capped at. The estimate is kept in the information of the run.
+                self.n_capped += 1
+                loss, info = result
+                result = max(loss, threshold), {**info, "censored": True, "partial_loss": float(loss),
+                                                "threshold": float(threshold)}
+            return result
+
+        return capped
+
+    def incumbent_loss(self, config, seed):
+        # The loss of the incumbent on the same seed, or its mean loss if it was not evaluated on that seed
+        solver = self.initialized_optimizer.solver
+        incumbent, runhistory = solver.incumbent, solver.runhistory
+        if incumbent is None or config == incumbent:
+            return None
+        config_id = runhistory.config_ids[incumbent]
+        for key in runhistory.get_runs_for_config(incumbent, only_max_observed_budget=True):
+            if key.seed == seed:
+                return runhistory.data[RunKey(config_id, key.instance, key.seed, key.budget)].cost
+        return runhistory.get_cost(incumbent)
+
+    def follow_journal(self, evaluator: JournaledEvaluator):
+        stats = self.initialized_optimizer.stats
+        logger = self.initialized_optimizer.solver.intensifier.traj_logger
+        add_entry = logger.add_entry
+
+        def skip_time(seconds):
+            # Replayed evaluations return at once, so the clock is moved forward by the time they originally took, and
+            # that time is counted as target algorithm time
+            stats._start_time -= seconds
+            stats.ta_time_used += seconds
+
+        def add_and_journal_entry(train_perf, incumbent_id, incumbent, budget=0):
+            add_entry(train_perf, incumbent_id, incumbent, budget)
+            if evaluator.replaying:
+                return  # Already in the journal
+            entry = logger.trajectory[-1]
+            evaluator.journal.append({"type": "incumbent", "conf": evaluator.plain(incumbent),
+                                      "loss": float(train_perf), "at_iteration": int(entry.ta_runs),
+                                      "at_time": entry.wallclock_time})
+
+        evaluator.on_replay = skip_time
+        logger.add_entry = add_and_journal_entry
+
+    def profile(self, profiler: Profiler):
+        # The acquisition function is optimized with predictions of the EPM, which are also recorded as epm_predict
+        epm_chooser = self.initialized_optimizer.solver.epm_chooser
+        epm_chooser.model.train = profiler.wrap(epm_chooser.model.train, "epm_train")
+        epm_chooser.model.predict = profiler.wrap(epm_chooser.model.predict, "epm_predict")
+        epm_chooser.acq_optimizer.maximize = profiler.wrap(epm_chooser.acq_optimizer.maximize, "acquisition")
 
     def search(self) -> Configuration:
         return self.initialized_optimizer.optimize()
@@ -44,19 +124,22 @@ class SMACBasedOptimizer(Optimizer):
     def get_trajectory(self) -> Trajectory:
         config_id_to_seeds = self.config_id_to_seeds()
         return Trajectory([
-            Entry(
-                conf=dict(entry.incumbent),
-                loss=entry.train_perf,
-                at_iteration=int(entry.ta_runs),
-                at_time=entry.wallclock_time,
-                seeds=self.get_seeds(entry, config_id_to_seeds)
-            )
+            self.get_entry(entry, config_id_to_seeds)
             for entry in self.initialized_optimizer.get_trajectory()[1:]  # Skip the first one
         ])
 
+    def get_entry(self, entry, config_id_to_seeds) -> Entry:
+        return Entry(
+            conf=dict(entry.incumbent),
+            loss=entry.train_perf,
+            at_iteration=int(entry.ta_runs),
+            at_time=entry.wallclock_time,
+            seeds=self.get_seeds(entry, config_id_to_seeds)
+        )
+
     def get_stats(self):
         stats = self.initialized_optimizer.stats
-        return {
+        result = {
             "mean_cost": np.mean([i.cost for i in self.initialized_optimizer.runhistory.data.values()]),
             "finished_ta_runs": stats.finished_ta_runs,
             "inc_changed": stats.inc_changed,
@@ -65,6 +148,12 @@ class SMACBasedOptimizer(Optimizer):
             "ta_time_used": stats.ta_time_used,
             "wallclock_time_used": stats.wallclock_time_used
         }
+        if self.batch_proposer is not None:
+            result["batches"] = self.batch_proposer.n_batches
+            result["prefetch_time"] = self.batch_proposer.prefetch_time
+        if self.capping is not None:
+            result["capped_runs"] = self.n_capped
+        return result
 
     def get_seeds(self, entry, config_id_to_seeds):
         opt = self.initialized_optimizer
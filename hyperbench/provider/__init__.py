@@ -1,2 +1,3 @@
 from .base import Provider
-from .openml import OpenMLProvider
\ No newline at end of file
+from .local import LocalFileProvider
+from .openml import OpenMLProvider
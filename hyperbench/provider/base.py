@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from functools import cache
 
 from hyperbench.dataset.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
 
 
 class Provider(ABC):
@@ -15,13 +16,18 @@ class Provider(ABC):
     def data(self) -> Dataset:
         pass
 
+    @property
+    def metadata(self) -> Metadata:
+        # Providers that can read the metadata without loading the data should override this
+        return self.data.metadata
+
     @property
     @abstractmethod
     def stats(self) -> dict:
         return self.default_stats()
 
     def default_stats(self):
-        metadata = self.data.metadata
+        metadata = self.metadata
         return {
             "id": metadata.id,
             "name": metadata.name,
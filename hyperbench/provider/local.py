@@ -0,0 +1,209 @@
+import dataclasses
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+
+from hyperbench.dataset.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
+from hyperbench.dataset.store import DatasetStore
+from hyperbench.provider.base import Provider
+
+
+class LocalFileProvider(Provider):
+    """
+    Provides a dataset from a Parquet, CSV or NPZ file on the local disk.
+
+    For Parquet and CSV files, `target` is the name of the column with the labels. Columns that are not numeric, or
+    that are listed in `categorical`, are treated as categorical and encoded as integers, with NaN for missing values.
+    The values in `na_values`, such as "?", are missing values as well. These files are read in chunks of `chunksize`
+    rows, which are written to a temporary file on disk, so that large files never need to fit in memory as a whole.
+    CSV files are scanned once before, because pandas infers the types of every chunk on its own. NPZ files should
+    contain the arrays `X` and `y`, and optionally the indices of the categorical columns as `categorical`.
+
+    If a store is given, the parsed dataset is kept there as memory-mapped arrays, and the file is only parsed again
+    when it has changed.
+    """
+
+    def __init__(self, path: str, target: str = None, name: str = None, categorical: list = None,
+                 store: DatasetStore = None, chunksize: int = 100_000, na_values=("?",)):
+        self.path = path
+        self.target = target
+        self.name = name or os.path.splitext(os.path.basename(path))[0]
+        self.id = self.name
+        self.categorical = categorical or []
+        self.store = store
+        self.chunksize = chunksize
+        self.na_values = list(na_values)
+        self._data = None
+        self._metadata = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.store is not None:
+            state["_data"] = None
+        return state
+
+    @property
+    def store_key(self):
+        # Changes to the file result in a different key, so that an outdated copy is never used
+        stat = os.stat(self.path)
+        identity = f"{os.path.abspath(self.path)}:{stat.st_size}:{stat.st_mtime_ns}:{self.target}:{self.categorical}:" \
+                   f"{self.na_values}"
+        return f"local-{self.name}-{hashlib.sha256(identity.encode()).hexdigest()[:16]}"
+
+    @property
+    def stats(self):
+        return {
+            **self.default_stats(),
+            "path": self.path
+        }
+
+    @property
+    def data(self) -> Dataset:
+        if self._data is None:
+            with tempfile.TemporaryDirectory() as folder:
+                if self.store is None:
+                    dataset = self._read(folder)
+                    self._data = dataclasses.replace(dataset, X=np.array(dataset.X), y=np.array(dataset.y))
+                else:
+                    key = self.store_key
+                    if not self.store.contains(key):
+                        self.store.save(key, self._read(folder))
+                    self._data = self.store.load(key)
+            self._metadata = self._data.metadata
+        return self._data
+
+    @property
+    def metadata(self) -> Metadata:
+        if self._metadata is None:
+            if self.store is not None and self.store.contains(self.store_key):
+                self._metadata = self.store.load_metadata(self.store_key)
+            else:
+                self._metadata = self.data.metadata
+        return self._metadata
+
+    def _read(self, folder):
+        # Large arrays are written to the folder and returned as memory maps
+        extension = os.path.splitext(self.path)[1].lower()
+        if extension == ".npz":
+            return self._read_npz()
+        if extension == ".csv":
+            return self._read_chunks(self._csv_chunks(), folder)
+        if extension in [".parquet", ".pq"]:
+            return self._read_chunks(self._parquet_chunks(), folder)
+        raise ValueError(f"Unsupported file type '{extension}', use a Parquet, CSV or NPZ file")
+
+    def _csv_chunks(self):
+        # A column is only numeric if it is numeric in every chunk. The other columns and the target are read as
+        # strings, so that a value gets the same code in every chunk.
+        categorical = set(self.categorical)
+        for chunk in pd.read_csv(self.path, chunksize=self.chunksize, na_values=self.na_values):
+            categorical.update(column for column in chunk.columns
+                               if is_bool_dtype(chunk[column].dtype) or not is_numeric_dtype(chunk[column].dtype))
+        if self.target is not None:
+            categorical.add(self.target)
+        yield from pd.read_csv(self.path, chunksize=self.chunksize, na_values=self.na_values,
+                               dtype={column: str for column in categorical})
+
+    def _parquet_chunks(self):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunksize):
+            yield batch.to_pandas()
+
+    def _read_npz(self):
+        with np.load(self.path, allow_pickle=False) as file:
+            X = file["X"].astype(float)
+            _, y = np.unique(file["y"], return_inverse=True)
+            categorical = file["categorical"].tolist() if "categorical" in file else list(self.categorical)
+
+        numeric = [i for i in range(X.shape[1]) if i not in categorical]
+        return Dataset(X, y, self._get_metadata(X, y, categorical, numeric, np.isnan(X).sum()))
+
+    def _read_chunks(self, chunks, folder):
+        encoder = ChunkEncoder(self.target, self.categorical)
+        n_rows, n_missing = 0, 0
+
+        X_file, y_file = os.path.join(folder, "X.bin"), os.path.join(folder, "y.bin")
+        with open(X_file, "wb") as X_out, open(y_file, "wb") as y_out:
+            for chunk in chunks:
+                X, y = encoder.encode(chunk)
+                X_out.write(X.tobytes())
+                y_out.write(y.tobytes())
+                n_rows += X.shape[0]
+                n_missing += np.isnan(X).sum()
+
+        if n_rows == 0:
+            raise ValueError(f"No rows found in {self.path}")
+
+        X = np.memmap(X_file, dtype=float, mode="r", shape=(n_rows, len(encoder.features)))
+        y = np.memmap(y_file, dtype=np.int64, mode="r", shape=(n_rows,))
+        metadata = self._get_metadata(X, y, encoder.categorical_indices, encoder.numeric_indices, n_missing)
+        return Dataset(X, y, metadata)
+
+    def _get_metadata(self, X, y, categorical, numeric, n_missing):
+        return Metadata(
+            id=self.id,
+            name=self.name,
+            categorical=categorical,
+            numeric=numeric,
+            n_rows=X.shape[0],
+            n_columns=X.shape[1],
+            n_classes=np.unique(y).shape[0],
+            n_missing=int(n_missing)
+        )
+
+
+class ChunkEncoder:
+    """
+    Turns chunks of a table into numeric arrays. The column types are inferred from the first chunk, so they should be
+    the same in every chunk. Categorical values are compared as strings, and get the same code in every chunk.
+    """
+
+    def __init__(self, target, categorical):
+        self.target = target
+        self.categorical = list(categorical)
+        self.features = None
+        self.codes = {}
+
+    @property
+    def categorical_indices(self):
+        return [i for i, column in enumerate(self.features) if column in self.codes]
+
+    @property
+    def numeric_indices(self):
+        return [i for i, column in enumerate(self.features) if column not in self.codes]
+
+    def encode(self, chunk: pd.DataFrame):
+        if self.target not in chunk.columns:
+            raise ValueError(f"Target column '{self.target}' not found")
+
+        if self.features is None:
+            self.features = [column for column in chunk.columns if column != self.target]
+            for column in self.features:
+                dtype = chunk[column].dtype
+                if column in self.categorical or is_bool_dtype(dtype) or not is_numeric_dtype(dtype):
+                    self.codes[column] = {}
+
+        X = np.empty((len(chunk), len(self.features)))
+        for i, column in enumerate(self.features):
+            if column in self.codes:
+                X[:, i] = self.encode_categorical(column, chunk[column])
+            else:
+                X[:, i] = pd.to_numeric(chunk[column], errors="raise").to_numpy(dtype=float, na_value=np.nan)
+
+        y = self.encode_categorical(self.target, chunk[self.target])
+        if np.isnan(y).any():
+            raise ValueError(f"Target column '{self.target}' has missing values")
+        return X, y.astype(np.int64)
+
+    def encode_categorical(self, column, values: pd.Series):
+        codes = self.codes.setdefault(column, {})
+        values = values.astype(str).where(values.notna())
+        for value in values.dropna().unique():
+            if value not in codes:
+                codes[value] = len(codes)
+        return values.map(codes).to_numpy(dtype=float, na_value=np.nan)
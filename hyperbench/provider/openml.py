@@ -1,43 +1,83 @@
+from functools import cached_property
+
 import numpy as np
 
 import openml
 from hyperbench.dataset.dataset import Dataset
 from hyperbench.dataset.metadata import Metadata
+from hyperbench.dataset.store import DatasetStore
 from hyperbench.provider.base import Provider
 
 
 class OpenMLProvider(Provider):
 
-    def __init__(self, dataset_id):
+    def __init__(self, dataset_id, store: DatasetStore = None):
         self.task_id = dataset_id
         self.id = dataset_id
+        self.store = store
         self._data = None
         self._metadata = None
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.store is not None:
+            # Other processes open the memory-mapped arrays from the store themselves
+            state["_data"] = None
+            state.pop("_task", None)
+            state.pop("_dataset", None)
+        return state
+
+    @property
+    def store_key(self):
+        return f"openml-{self.task_id}"
+
     @property
     def stats(self):
         return {
             **self.default_stats(),
             "task_url": f"https://www.openml.org/t/{self.id}",
-            "data_url": f"https://www.openml.org/d/{self._dataset.id}"
+            "data_url": f"https://www.openml.org/d/{self._data_id}"
         }
 
     @property
     def data(self) -> Dataset:
         if self._data is None:
-            X, y = self._xy
-            self._metadata = self._get_metadata(X, y)
-            self._data = Dataset(X, y, self._metadata)
+            if self.store is None:
+                self._data = self._download()
+            else:
+                if not self.store.contains(self.store_key):
+                    self.store.save(self.store_key, self._download(), data_id=self._dataset.id)
+                self._data = self.store.load(self.store_key)
+            self._metadata = self._data.metadata
         return self._data
 
     @property
+    def metadata(self) -> Metadata:
+        if self._metadata is None:
+            if self.store is not None and self.store.contains(self.store_key):
+                self._metadata = self.store.load_metadata(self.store_key)
+            else:
+                self._metadata = self.data.metadata
+        return self._metadata
+
+    def _download(self):
+        X, y = self._xy
+        return Dataset(X, y, self._get_metadata(X, y))
+
+    @cached_property
     def _task(self):
         return openml.tasks.get_task(self.task_id)
 
-    @property
+    @cached_property
     def _dataset(self):
         return self._task.get_dataset()
 
+    @property
+    def _data_id(self):
+        if self.store is not None and self.store.contains(self.store_key):
+            return self.store.load_info(self.store_key)["data_id"]
+        return self._dataset.id
+
     @property
     def _xy(self):
         return self._task.get_X_and_y()
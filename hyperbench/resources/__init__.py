@@ -0,0 +1,2 @@
+from .cpu_budget import CPUBudget
+from .profiler import Profiler
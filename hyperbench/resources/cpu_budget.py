@@ -0,0 +1,54 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Optional
+
+from joblib import parallel_backend
+from threadpoolctl import threadpool_limits
+
+
+@dataclass(frozen=True)
+class CPUBudget:
+    """
+    The number of cores that a single experiment may use. The cores are divided over the cross-validation folds (or
+    replayed incumbents) that run in parallel, and the threads that the target algorithm uses within each fit. When
+    `n_cpus` is None, there is no budget: the folds are spread over all cores and the models use their default number
+    of threads.
+    """
+    n_cpus: Optional[int] = None
+    n_folds: Optional[int] = None
+
+    @property
+    def cv_jobs(self):
+        if self.n_cpus is None:
+            return -1
+        return max(1, min(self.n_cpus, self.n_folds or self.n_cpus))
+
+    @property
+    def model_jobs(self):
+        if self.n_cpus is None:
+            return None
+        return max(1, self.n_cpus // self.cv_jobs)
+
+    def limit(self):
+        if self.n_cpus is None:
+            return nullcontext()
+        return self._limit(self.model_jobs)
+
+    @staticmethod
+    @contextmanager
+    def _limit(n_threads):
+        # Limits the BLAS/OpenMP thread pools of this process, and of the joblib workers that are started within it
+        with threadpool_limits(limits=n_threads), parallel_backend("loky", inner_max_num_threads=n_threads):
+            yield
+
+    def limit_threads(self):
+        if self.n_cpus is None:
+            return nullcontext()
+        return self._limit_threads(self.model_jobs)
+
+    @staticmethod
+    @contextmanager
+    def _limit_threads(n_threads):
+        # For fits that run in this process and use the cores for their own threads, e.g. the trees of a random forest
+        with threadpool_limits(limits=n_threads), parallel_backend("threading", n_jobs=n_threads):
+            yield
@@ -0,0 +1,86 @@
+import sys
+import time
+from contextlib import contextmanager
+
+import psutil
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class Profiler:
+    """
+    Measures the wall-clock time, the CPU time and the memory of the sections of an experiment, such as loading the
+    data, the evaluations of the target algorithm and the training of the EPM. Every section is kept as an event of a
+    trace in the Chrome trace format, which can be opened in Perfetto or chrome://tracing, and the events are summed per
+    section for the statistics of the experiment. The CPU time and memory are those of the process of the experiment,
+    except for the folds, whose CPU time is measured where they are fitted. A disabled profiler records nothing.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.events = []
+        self.origin = time.perf_counter()
+        self._process = psutil.Process()
+
+    @contextmanager
+    def section(self, name: str, **args):
+        if not self.enabled:
+            yield
+            return
+        start, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, time.process_time() - cpu, start=start, **args)
+
+    def record(self, name: str, wall: float, cpu: float = None, start: float = None, lane: int = 0, **args):
+        # Sections that were measured elsewhere, e.g. in a worker, are recorded afterwards. Folds that run in parallel
+        # get a lane of their own in the trace.
+        if not self.enabled:
+            return
+        if start is None:
+            start = time.perf_counter() - wall
+        self.events.append({"name": name, "start": start - self.origin, "wall": wall, "cpu": cpu, "lane": lane,
+                            "rss": self._process.memory_info().rss, "args": args})
+
+    def wrap(self, function, name: str):
+        """Returns the function, with every call recorded as a section."""
+        if not self.enabled:
+            return function
+
+        def profiled(*args, **kwargs):
+            with self.section(name):
+                return function(*args, **kwargs)
+
+        return profiled
+
+    def peak_rss(self) -> int:
+        peak = max([event["rss"] for event in self.events], default=self._process.memory_info().rss)
+        if resource is not None:
+            # Linux reports the peak in kilobytes, macOS in bytes
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            peak = max(peak, max_rss if sys.platform == "darwin" else max_rss * 1024)
+        return peak
+
+    def summary(self) -> dict:
+        sections = {}
+        for event in self.events:
+            section = sections.setdefault(event["name"], {"count": 0, "wall": 0.0, "cpu": None})
+            section["count"] += 1
+            section["wall"] += event["wall"]
+            if event["cpu"] is not None:
+                section["cpu"] = (section["cpu"] or 0.0) + event["cpu"]
+        return {"sections": sections, "peak_rss": self.peak_rss()}
+
+    def trace(self) -> dict:
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {"name": event["name"], "ph": "X", "ts": event["start"] * 1e6, "dur": event["wall"] * 1e6, "pid": 0,
+                 "tid": event["lane"], "args": {"cpu_time": event["cpu"], "rss": event["rss"], **event["args"]}}
+                for event in self.events
+            ]
+        }
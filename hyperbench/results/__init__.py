@@ -0,0 +1,12 @@
+from .base import ResultsBackend
+from .json_tree import JSONTreeBackend
+from .sqlite import SQLiteBackend
+from .index import ResultsIndex
+from .journal import Journal, JournaledEvaluator
+
+
+def open_results(location: str) -> ResultsBackend:
+    """Results are stored in a SQLite file if the location ends with .sqlite or .db, and in a folder otherwise."""
+    if location.endswith((".sqlite", ".db")):
+        return SQLiteBackend(location)
+    return JSONTreeBackend(location)
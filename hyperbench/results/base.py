@@ -0,0 +1,77 @@
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Iterator, Optional
+
+from hyperbench.results.journal import Journal
+from hyperbench.trajectory import Trajectory
+
+
+class ResultsBackend(ABC):
+    """
+    Stores the results of the experiments. Every experiment (target algorithm, optimizer, seed and dataset) has a search
+    trajectory, an evaluation trajectory and a dictionary with statistics, which are committed together, and a trace
+    when the experiment was profiled.
+    """
+
+    @abstractmethod
+    def exists(self, target: str, optimizer: str, seed, dataset: str) -> bool:
+        pass
+
+    @abstractmethod
+    def commit(self, target: str, optimizer: str, seed, dataset: str, search: Trajectory, evaluation: Trajectory,
+               stats: dict, trace: dict = None):
+        pass
+
+    @property
+    @abstractmethod
+    def journal_folder(self) -> str:
+        pass
+
+    def journal(self, target: str, optimizer: str, seed, dataset: str, split: int = 0) -> Journal:
+        """The journal of a search that is running, or that was interrupted before its results were committed."""
+        return Journal(os.path.join(self.journal_folder, target, optimizer, str(seed), dataset, f"{split}.jsonl"))
+
+    @abstractmethod
+    def targets(self) -> list[str]:
+        pass
+
+    @abstractmethod
+    def load_trajectories(self, target: str) -> Iterator[tuple[str, str, str, str, Trajectory]]:
+        """Yields the optimizer, seed, dataset, stage and trajectory of every stored trajectory of the target."""
+        pass
+
+    @abstractmethod
+    def load_trajectory(self, target: str, optimizer: str, seed, dataset: str, stage: str) -> Trajectory:
+        pass
+
+    @abstractmethod
+    def versions(self, target: str) -> Iterator[tuple[tuple[str, str, str, str], object]]:
+        """
+        Yields the optimizer, seed, dataset and stage of every stored trajectory of the target, together with a value
+        that changes whenever the trajectory is written again.
+        """
+        pass
+
+    @abstractmethod
+    def load_stats(self, target: str) -> Iterator[tuple[str, str, str, dict]]:
+        """Yields the optimizer, seed, dataset and statistics of every experiment of the target."""
+        pass
+
+    @abstractmethod
+    def load_trace(self, target: str, optimizer: str, seed, dataset: str) -> Optional[dict]:
+        """The trace of an experiment, or None if it was not profiled."""
+        pass
+
+    def export(self, other: "ResultsBackend"):
+        # Copies all complete experiments to another backend
+        for target in self.targets():
+            trajectories = defaultdict(dict)
+            for optimizer, seed, dataset, stage, trajectory in self.load_trajectories(target):
+                trajectories[optimizer, seed, dataset][stage] = trajectory
+
+            for optimizer, seed, dataset, stats in self.load_stats(target):
+                stages = trajectories[optimizer, seed, dataset]
+                if "search" in stages and "eval" in stages:
+                    other.commit(target, optimizer, seed, dataset, stages["search"], stages["eval"], stats,
+                                 self.load_trace(target, optimizer, seed, dataset))
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import pickle
+import threading
+
+from hyperbench.results.base import ResultsBackend
+
+
+class ResultsIndex:
+    """
+    Keeps the trajectories of a results backend in memory, and in a file next to the results, so that they are not read
+    and parsed again every time they are needed. On every update, only the trajectories that are new or that were
+    written again since the previous update are read from the backend.
+    """
+
+    def __init__(self, results: ResultsBackend, file: str):
+        self.results = results
+        self.file = file
+        self.lock = threading.Lock()
+        self.targets = self.read()  # target -> {(optimizer, seed, dataset, stage): (version, trajectory)}
+
+    @staticmethod
+    def open(location: str):
+        from hyperbench.results import open_results
+        results = open_results(location)
+        if location.endswith((".sqlite", ".db")):
+            return ResultsIndex(results, f"{location}.index.pkl")
+        return ResultsIndex(results, os.path.join(location, ".hyperbench_index.pkl"))
+
+    def read(self):
+        try:
+            with open(self.file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # A missing or outdated index is rebuilt from the results
+            return {}
+
+    def write(self):
+        folder = os.path.dirname(self.file)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temporary = f"{self.file}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(self.targets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.file)
+
+    def update(self, target: str) -> str:
+        """Reads the new and changed trajectories of the target, and returns a signature of its current results."""
+        with self.lock:
+            versions = dict(self.results.versions(target))
+            known = self.targets.get(target, {})
+            if target not in self.targets or known.keys() != versions.keys() or \
+                    any(known[key][0] != version for key, version in versions.items()):
+                self.targets[target] = {
+                    key: known[key] if key in known and known[key][0] == version
+                    else (version, self.results.load_trajectory(target, *key))
+                    for key, version in versions.items()
+                }
+                self.write()
+            return hashlib.sha1(repr(sorted(versions.items())).encode()).hexdigest()
+
+    def load_trajectories(self, target: str):
+        """Yields the optimizer, seed, dataset, stage and trajectory of every indexed trajectory of the target."""
+        with self.lock:
+            items = list(self.targets.get(target, {}).items())
+        for (optimizer, seed, dataset, stage), (_, trajectory) in sorted(items):
+            yield optimizer, seed, dataset, stage, trajectory
@@ -0,0 +1,141 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+class Journal:
+    """
+    Append-only log of a search that is still running, with one JSON record per line. Every record is handed to the
+    operating system right away, so that it survives when the process is killed, but the file is only synced to disk
+    every `sync_every` records or `sync_interval` seconds. When the process crashes, the journal is used to resume the
+    search, and after the results of the search are committed, it is removed.
+    """
+
+    def __init__(self, file: str, sync_every: int = 32, sync_interval: float = 5.0):
+        self.file = file
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def records(self) -> list[dict]:
+        records, _ = self.read()
+        return records
+
+    def read(self):
+        # Returns the complete records, and the length of the file without the record that was cut off by a crash
+        records, length = [], 0
+        if not os.path.exists(self.file):
+            return records, length
+        with open(self.file, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    records.pop()
+                    break
+                length += len(line)
+        return records, length
+
+    def append(self, record: dict):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.file), exist_ok=True)
+            _, length = self.read()
+            self._file = open(self.file, "ab")
+            self._file.truncate(length)
+        self._file.write(json.dumps(record).encode() + b"\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.file):
+            os.remove(self.file)
+
+
+class JournaledEvaluator:
+    """
+    Writes every evaluation to the journal, and returns the loss of evaluations that are already in the journal without
+    running them again. Optimizers that start from the same seed propose the same configurations when they get the same
+    losses, so a search that was interrupted quickly replays up to where it stopped. The journaled runs are counted in
+    the progress right away.
+    """
+
+    def __init__(self, evaluate, journal: Journal, progress, loop_iterations):
+        self.evaluate = evaluate
+        self.journal = journal
+        self.progress = progress
+        self.loop_iterations = loop_iterations
+        self.replayed = 0
+        self.replaying = False  # Whether the last evaluation was replayed
+        self.on_replay = None  # Called with the time that a replayed evaluation originally took
+
+        self.runs = {}  # (config, seed, budget) -> list of (loss, time)
+        completed = 0
+        for record in journal.records():
+            if record["type"] == "run":
+                loss = (record["loss"], record["info"]) if "info" in record else record["loss"]
+                self.runs.setdefault(self.key(record["config"], record["seed"], record.get("budget")), []).append(
+                    (loss, record["time"]))
+                completed += 1 if record.get("budget") is None else min(record["budget"], 1)
+        if completed:
+            self.progress.update(self.loop_iterations, advance=completed)
+
+    @staticmethod
+    def plain(config):
+        return {k: v.item() if isinstance(v, np.generic) else v for k, v in dict(config).items()}
+
+    @staticmethod
+    def key(config, seed, budget=None):
+        return json.dumps(JournaledEvaluator.plain(config), sort_keys=True), int(seed), \
+            None if budget is None else float(budget)
+
+    def __call__(self, config, seed, budget=None, cap=None):
+        budget = budget or None  # Optimizers without fidelities pass a budget of 0
+        runs = self.runs.get(self.key(config, seed, budget))
+        self.replaying = bool(runs)
+        if runs:
+            loss, duration = runs.pop(0)
+            self.replayed += 1
+            if self.on_replay is not None:
+                self.on_replay(duration)
+            return loss
+
+        tic = time.perf_counter()
+        loss = self.evaluate(config, seed) if budget is None and cap is None else \
+            self.evaluate(config, seed, budget, cap=cap)
+        record = {"type": "run", "config": self.plain(config), "seed": int(seed), "time": time.perf_counter() - tic}
+        if isinstance(loss, tuple):
+            # Capped evaluations also return information for the optimizer
+            record["loss"], record["info"] = float(loss[0]), loss[1]
+        else:
+            record["loss"] = float(loss)
+        if budget is not None:
+            record["budget"] = float(budget)
+        self.journal.append(record)
+        return loss
+
+    def prefetch(self, runs):
+        # Runs in the journal do not need to be evaluated ahead, but the batch is always passed on, see EvaluationCache
+        missing = [run for run in runs if not self.runs.get(self.key(*run))]
+        if hasattr(self.evaluate, "prefetch"):
+            self.evaluate.prefetch(missing)
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import uuid
+
+from hyperbench.results.base import ResultsBackend
+from hyperbench.trajectory import Trajectory
+
+
+class JSONTreeBackend(ResultsBackend):
+    """
+    Stores every experiment in its own folder, `<target>/<optimizer>/<seed>/<dataset>`, with the files `search.json`,
+    `eval.json` and `stats.json`, and `trace.json` when the experiment was profiled. The files of an experiment are
+    written to a staging folder first, which is then moved into place, so that an experiment is either complete or not
+    there at all.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, target, optimizer, seed, dataset):
+        return os.path.join(self.directory, target, optimizer, str(seed), dataset)
+
+    @property
+    def journal_folder(self):
+        return os.path.join(self.directory, ".journal")
+
+    def exists(self, target, optimizer, seed, dataset):
+        # Folders of experiments that were interrupted while they were committed have no statistics
+        return os.path.exists(os.path.join(self.path(target, optimizer, seed, dataset), "stats.json"))
+
+    def commit(self, target, optimizer, seed, dataset, search, evaluation, stats, trace=None):
+        path = self.path(target, optimizer, seed, dataset)
+        staging = os.path.join(self.directory, ".staging")
+        folder = os.path.join(staging, uuid.uuid4().hex)
+        os.makedirs(folder)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.write(os.path.join(folder, "search.json"), search.to_dicts())
+        self.write(os.path.join(folder, "eval.json"), evaluation.to_dicts())
+        self.write(os.path.join(folder, "stats.json"), stats)
+        if trace is not None:
+            self.write(os.path.join(folder, "trace.json"), trace)
+
+        # A folder can only be moved to a path that does not exist, so a previous result is moved out of the way first
+        previous = os.path.join(staging, uuid.uuid4().hex)
+        if os.path.exists(path):
+            os.replace(path, previous)
+        os.replace(folder, path)
+        shutil.rmtree(previous, ignore_errors=True)
+
+    @staticmethod
+    def write(file, data):
+        # Replacing the file at once makes sure that readers never see a partially written file
+        temporary = f"{file}.tmp"
+        with open(temporary, "w+") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temporary, file)
+
+    def targets(self):
+        return [f for f in os.listdir(self.directory) if not f.startswith(".")]
+
+    def load_trajectories(self, target):
+        for optimizer, seed, dataset, file in self.walk(target):
+            if file in ["search.json", "eval.json"]:
+                path = self.path(target, optimizer, seed, dataset)
+                yield optimizer, seed, dataset, file.replace(".json", ""), Trajectory.load(os.path.join(path, file))
+
+    def load_trajectory(self, target, optimizer, seed, dataset, stage):
+        return Trajectory.load(os.path.join(self.path(target, optimizer, seed, dataset), f"{stage}.json"))
+
+    def versions(self, target):
+        for optimizer, seed, dataset, file in self.walk(target):
+            if file in ["search.json", "eval.json"]:
+                stat = os.stat(os.path.join(self.path(target, optimizer, seed, dataset), file))
+                yield (optimizer, seed, dataset, file.replace(".json", "")), (stat.st_mtime_ns, stat.st_size)
+
+    def load_stats(self, target):
+        for optimizer, seed, dataset, file in self.walk(target):
+            if file == "stats.json":
+                with open(os.path.join(self.path(target, optimizer, seed, dataset), file), "r") as f:
+                    yield optimizer, seed, dataset, json.load(f)
+
+    def load_trace(self, target, optimizer, seed, dataset):
+        file = os.path.join(self.path(target, optimizer, seed, dataset), "trace.json")
+        if not os.path.exists(file):
+            return None
+        with open(file, "r") as f:
+            return json.load(f)
+
+    def walk(self, target):
+        directory = os.path.join(self.directory, target)
+        for currentpath, folders, files in os.walk(directory):
+            details = os.path.relpath(currentpath, directory).split(os.sep)
+            if len(details) != 3:
+                continue
+            for file in files:
+                yield *details, file
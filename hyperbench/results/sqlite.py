@@ -0,0 +1,99 @@
+import json
+import os
+import sqlite3
+
+from hyperbench.results.base import ResultsBackend
+from hyperbench.trajectory import Trajectory
+
+
+class SQLiteBackend(ResultsBackend):
+    """
+    Stores all experiments in a single SQLite file. The trajectories and statistics of an experiment are written in one
+    transaction, and all results of a target algorithm are loaded with a single query.
+    """
+
+    def __init__(self, file: str):
+        self.file = file
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_connection": None, "_pid": None}
+
+    @property
+    def connection(self):
+        # Connections can not be shared between processes, so every process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            folder = os.path.dirname(self.file)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._connection = sqlite3.connect(self.file, timeout=60)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS trajectories (target TEXT, optimizer TEXT, seed TEXT, "
+                                     "dataset TEXT, stage TEXT, entries TEXT NOT NULL, "
+                                     "PRIMARY KEY (target, optimizer, seed, dataset, stage))")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS stats (target TEXT, optimizer TEXT, seed TEXT, "
+                                     "dataset TEXT, stats TEXT NOT NULL, PRIMARY KEY (target, optimizer, seed, dataset))")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS traces (target TEXT, optimizer TEXT, seed TEXT, "
+                                     "dataset TEXT, trace TEXT NOT NULL, "
+                                     "PRIMARY KEY (target, optimizer, seed, dataset))")
+            self._connection.commit()
+            self._pid = os.getpid()
+        return self._connection
+
+    def exists(self, target, optimizer, seed, dataset):
+        # The statistics are committed together with the trajectories, so they only exist for complete experiments
+        row = self.connection.execute("SELECT 1 FROM stats WHERE target = ? AND optimizer = ? AND seed = ? "
+                                      "AND dataset = ?", (target, optimizer, str(seed), dataset)).fetchone()
+        return row is not None
+
+    def commit(self, target, optimizer, seed, dataset, search, evaluation, stats, trace=None):
+        key = (target, optimizer, str(seed), dataset)
+        with self.connection as connection:
+            connection.execute("INSERT OR REPLACE INTO trajectories VALUES (?, ?, ?, ?, ?, ?)",
+                               (*key, "search", json.dumps(search.to_dicts())))
+            connection.execute("INSERT OR REPLACE INTO trajectories VALUES (?, ?, ?, ?, ?, ?)",
+                               (*key, "eval", json.dumps(evaluation.to_dicts())))
+            connection.execute("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)", (*key, json.dumps(stats)))
+            if trace is not None:
+                connection.execute("INSERT OR REPLACE INTO traces VALUES (?, ?, ?, ?, ?)", (*key, json.dumps(trace)))
+            else:
+                connection.execute("DELETE FROM traces WHERE target = ? AND optimizer = ? AND seed = ? AND dataset = ?",
+                                   key)
+
+    @property
+    def journal_folder(self):
+        return f"{self.file}.journal"
+
+    def targets(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT target FROM stats ORDER BY target")]
+
+    def load_trajectories(self, target):
+        rows = self.connection.execute("SELECT optimizer, seed, dataset, stage, entries FROM trajectories "
+                                       "WHERE target = ?", (target,)).fetchall()
+        for optimizer, seed, dataset, stage, entries in rows:
+            yield optimizer, seed, dataset, stage, Trajectory.from_dicts(json.loads(entries))
+
+    def load_trajectory(self, target, optimizer, seed, dataset, stage):
+        row = self.connection.execute("SELECT entries FROM trajectories WHERE target = ? AND optimizer = ? AND seed = ? "
+                                      "AND dataset = ? AND stage = ?",
+                                      (target, optimizer, str(seed), dataset, stage)).fetchone()
+        return Trajectory.from_dicts(json.loads(row[0]))
+
+    def versions(self, target):
+        # A replaced row gets a new rowid, and the length guards against the rare case where the rowid is reused
+        rows = self.connection.execute("SELECT optimizer, seed, dataset, stage, rowid, length(entries) "
+                                       "FROM trajectories WHERE target = ?", (target,)).fetchall()
+        for optimizer, seed, dataset, stage, rowid, length in rows:
+            yield (optimizer, seed, dataset, stage), (rowid, length)
+
+    def load_stats(self, target):
+        rows = self.connection.execute("SELECT optimizer, seed, dataset, stats FROM stats WHERE target = ?",
+                                       (target,)).fetchall()
+        for optimizer, seed, dataset, stats in rows:
+            yield optimizer, seed, dataset, json.loads(stats)
+
+    def load_trace(self, target, optimizer, seed, dataset):
+        row = self.connection.execute("SELECT trace FROM traces WHERE target = ? AND optimizer = ? AND seed = ? "
+                                      "AND dataset = ?", (target, optimizer, str(seed), dataset)).fetchone()
+        return json.loads(row[0]) if row is not None else None
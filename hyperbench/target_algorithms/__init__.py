@@ -1,8 +1,9 @@
 from .base import BaseTarget
-from .rf import RandomForest
+from .nystroem_svm import NystroemSVM
+from .rf import RandomForest, ThreadedRandomForest
 from .sgd import SGD
-from .svm import SVM
-from .xgboost import XGBoost
+from .svm import SVM, PrecomputedSVM
+from .xgboost import XGBoost, HistXGBoost
 
 
 def get_target_by_name(name):
@@ -14,4 +15,12 @@ def get_target_by_name(name):
         return SVM
     if name == XGBoost.name:
         return XGBoost
+    if name == NystroemSVM.name:
+        return NystroemSVM
+    if name == HistXGBoost.name:
+        return HistXGBoost
+    if name == ThreadedRandomForest.name:
+        return ThreadedRandomForest
+    if name == PrecomputedSVM.name:
+        return PrecomputedSVM
     return None
\ No newline at end of file
@@ -1,17 +1,35 @@
 import dataclasses
+import json
+import os
+import time
+import warnings
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 
 from ConfigSpace import ConfigurationSpace, Configuration
 import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
 from sklearn.metrics import get_scorer
-from sklearn.model_selection import cross_val_score
+from sklearn.model_selection import cross_validate
 
 from hyperbench.dataset import Dataset
 from hyperbench.dataset.metadata import Metadata
+from hyperbench.resources import CPUBudget, Profiler
+from hyperbench.target_algorithms.folds import SharedFolds
 from hyperbench.trajectory import Trajectory
 
 
 class BaseTarget(ABC):
+
+    # Constant that multi-fidelity optimizers scale with their budget, e.g. "n_estimators". When it is not set, the
+    # training folds are subsampled instead.
+    fidelity_parameter = None
+
+    # Targets that use all cores of the experiment within a single fit, and run the folds one after the other instead
+    # of spreading them over processes
+    native_threads = False
+
     @property
     @abstractmethod
     def name(self):
@@ -24,7 +42,7 @@ class BaseTarget(ABC):
 
     @staticmethod
     @abstractmethod
-    def init_model(seed, metadata: Metadata, **config) -> any:
+    def init_model(seed, metadata: Metadata, n_jobs=None, **config) -> any:
         pass
 
     @staticmethod
@@ -36,35 +54,251 @@ class BaseTarget(ABC):
     def config_space() -> ConfigurationSpace:
         pass
 
-    def get_config_evaluator(self, dataset: Dataset, train_test_splits, scoring, progress, loop_iterations):
-        def evaluate(config: Configuration, seed: int):
-            # Initialize algorithm
-            algorithm = self.init_model(seed, dataset.metadata, **dict(config))
+    def get_config_evaluator(self, dataset: Dataset, train_test_splits, scoring, progress, loop_iterations,
+                             cpu_budget=CPUBudget(), folds: SharedFolds = None, profiler: Profiler = None):
+        """
+        Returns a function that computes the cross-validation loss of a configuration. When `folds` are given, they
+        are used instead of splitting the search set with `train_test_splits` on every evaluation. The `profiler`
+        records every evaluation, and the fit and score times of its folds.
+        """
+        prefetched = {}
+        cpu_budget = self.evaluation_budget(cpu_budget)
+        profiler = profiler or Profiler(enabled=False)
 
-            # Perform cross validation
-            score = cross_val_score(
-                algorithm, dataset.X, dataset.y, n_jobs=-1, cv=train_test_splits, scoring=scoring
-            )
+        def evaluate(config: Configuration, seed: int, budget: float = None, cap=None):
+            # The budget of multi-fidelity optimizers is the fraction of a full evaluation. Other optimizers pass a
+            # budget of 0.
+            full = not budget or budget >= 1
+            loss = prefetched.pop((config, seed), None) if full else None
+            if loss is None:
+                with profiler.section("evaluate", seed=int(seed), budget=float(budget or 1)), \
+                        cpu_budget.limit_threads() if self.native_threads else nullcontext():
+                    # Initialize algorithm
+                    algorithm = self.init_model(seed, dataset.metadata, n_jobs=cpu_budget.model_jobs, **dict(config))
+                    cv = train_test_splits
+                    if not full:
+                        algorithm, cv = self.reduce_fidelity(algorithm, budget, seed, dataset, train_test_splits)
 
-            progress.update(loop_iterations, advance=1)
-            return 1 - np.mean(score)
+                    if cap is not None:
+                        loss = self.capped_cross_val(algorithm, dataset, cv, scoring, cap, cpu_budget,
+                                                     folds if cv is train_test_splits else None, profiler)
+                    elif folds is not None and cv is train_test_splits:
+                        loss = 1 - np.mean(self.cross_val_folds(algorithm, folds, scoring, cpu_budget, profiler))
+                    else:
+                        # Perform cross validation
+                        start = time.perf_counter()
+                        results = cross_validate(
+                            algorithm, dataset.X, dataset.y, n_jobs=cpu_budget.cv_jobs, cv=cv, scoring=scoring
+                        )
+                        self.record_folds(profiler, start, results["fit_time"], results["score_time"])
+                        loss = 1 - np.mean(results["test_score"])
 
+            progress.update(loop_iterations, advance=1 if full else budget)
+            return loss
+
+        def prefetch(runs):
+            # Evaluates several (config, seed) runs ahead of time, with the folds of all runs spread over the cores. The
+            # losses are kept until the runs are requested, or until the next batch replaces them, which drops the runs
+            # of challengers that were rejected before all of their runs were requested.
+            prefetched.clear()
+            if not runs:
+                return
+            n_folds = len(folds) if folds is not None else train_test_splits.get_n_splits()
+            budget = dataclasses.replace(cpu_budget, n_folds=len(runs) * n_folds)
+            scorer = get_scorer(scoring)
+            with budget.limit(), profiler.section("prefetch", runs=len(runs)):
+                if folds is not None and folds.executor is not None:
+                    scores = folds.executor.score(folds, [
+                        (self.init_model(seed, dataset.metadata, n_jobs=budget.model_jobs, **dict(config)), i)
+                        for config, seed in runs for i in range(len(folds))
+                    ], scoring)
+                elif folds is not None:
+                    scores = Parallel(n_jobs=budget.cv_jobs)(
+                        delayed(self.fit_and_score_arrays)(dict(config), seed, scorer, dataset.metadata, *arrays,
+                                                           budget.model_jobs)
+                        for config, seed in runs for arrays in folds.arrays
+                    )
+                else:
+                    indices = list(train_test_splits.split(dataset.X, dataset.y))
+                    scores = Parallel(n_jobs=budget.cv_jobs)(
+                        delayed(self.fit_and_score_fold)(dict(config), seed, scorer, dataset, train, test,
+                                                         budget.model_jobs)
+                        for config, seed in runs for train, test in indices
+                    )
+            for i, run in enumerate(runs):
+                prefetched[run] = 1 - np.mean(scores[i * n_folds:(i + 1) * n_folds])
+
+        evaluate.prefetch = prefetch
         return evaluate
 
-    def replay_trajectory(self, trajectory: Trajectory, scoring, search_data, eval_data, progress, loop_iterations):
+    def capped_cross_val(self, algorithm, dataset: Dataset, cv, scoring, cap, cpu_budget=CPUBudget(),
+                         folds: SharedFolds = None, profiler: Profiler = None):
+        """
+        Runs the folds in waves, and stops when `cap(losses, n_folds)` says that the losses of the folds so far are too
+        high for the configuration to beat the incumbent. A capped evaluation returns the mean loss of the folds that
+        were run, together with `{"capped": True}`, which the optimizer reports as a censored loss. When `folds` are
+        given, the waves run on the shared folds instead of splitting the dataset with `cv`, and on the workers of their
+        executor if they have one. The `profiler` records the folds of every wave.
+        """
+        scorer = get_scorer(scoring)
+        if folds is None:
+            splits = list(cv) if isinstance(cv, list) else list(cv.split(dataset.X, dataset.y))
+        n_folds = len(folds) if folds is not None else len(splits)
+
+        # There are at least two waves, otherwise nothing can be saved
+        wave_size = max(1, min(effective_n_jobs(cpu_budget.cv_jobs), int(np.ceil(n_folds / 2))))
+        if folds is not None and folds.executor is not None:
+            context = nullcontext()
+        elif folds is not None and cpu_budget.cv_jobs != 1:
+            context = nullcontext(folds.parallel)
+        else:
+            context = Parallel(n_jobs=min(wave_size, n_folds))
+
+        losses = []
+        with context as parallel:
+            for start in range(0, n_folds, wave_size):
+                wave = range(start, min(start + wave_size, n_folds))
+                tic = time.perf_counter()
+                if folds is None:
+                    results = parallel(
+                        delayed(self.timed_score_fold)(clone(algorithm), scorer, dataset, *splits[i]) for i in wave
+                    )
+                elif folds.executor is not None:
+                    results = folds.executor.score_timed(folds, [(clone(algorithm), i) for i in wave], scoring)
+                else:
+                    results = parallel(
+                        delayed(self.timed_score_arrays)(clone(algorithm), scorer, *folds.arrays[i]) for i in wave
+                    )
+                scores, fit_times, score_times, cpu_times = zip(*results)
+                if profiler is not None:
+                    self.record_folds(profiler, tic, fit_times, score_times, cpu_times, first=start)
+                losses.extend(1 - np.asarray(scores))
+                if len(losses) < n_folds and cap(losses, n_folds):
+                    return np.mean(losses), {"capped": True, "folds": len(losses)}
+
+        if np.isnan(losses).all():
+            raise ValueError(f"All the {n_folds} fits failed.")
+        return np.mean(losses)
+
+    def cross_val_folds(self, algorithm, folds: SharedFolds, scoring, cpu_budget=CPUBudget(), profiler=None):
+        """Scores the algorithm on the shared folds, in the same way as `cross_val_score`."""
+        scorer = get_scorer(scoring)
+        start = time.perf_counter()
+        if cpu_budget.cv_jobs == 1:
+            results = [self.timed_score_arrays(clone(algorithm), scorer, *arrays) for arrays in folds.arrays]
+        elif folds.executor is not None:
+            results = folds.executor.score_timed(folds, [(clone(algorithm), i) for i in range(len(folds))], scoring)
+        else:
+            results = folds.parallel(
+                delayed(self.timed_score_arrays)(clone(algorithm), scorer, *arrays) for arrays in folds.arrays
+            )
+        scores, fit_times, score_times, cpu_times = zip(*results)
+        if profiler is not None:
+            self.record_folds(profiler, start, fit_times, score_times, cpu_times)
+        if np.isnan(scores).all():
+            raise ValueError(f"All the {len(folds)} fits failed.")
+        return np.asarray(scores)
+
+    @staticmethod
+    def record_folds(profiler: Profiler, start, fit_times, score_times, cpu_times=None, first=0):
+        # The folds may have run in parallel, so each fold gets its own lane in the trace, starting with the evaluation
+        # or the wave of folds. `first` is the index of the first fold.
+        for i, (fit_time, score_time) in enumerate(zip(fit_times, score_times)):
+            profiler.record("fit", fit_time, cpu_times[i] if cpu_times is not None else None, start=start,
+                            lane=first + i + 1, fold=first + i)
+            profiler.record("score", score_time, start=start + fit_time, lane=first + i + 1, fold=first + i)
+
+    def evaluation_budget(self, cpu_budget: CPUBudget) -> CPUBudget:
+        """The cores of an evaluation, which targets with native threads give to a single fit at a time."""
+        if not self.native_threads:
+            return cpu_budget
+        return CPUBudget(cpu_budget.n_cpus or os.cpu_count(), n_folds=1)
+
+    def reduce_fidelity(self, algorithm, budget: float, seed: int, dataset: Dataset, train_test_splits):
+        """Scales the fidelity parameter of the algorithm by the budget, or otherwise subsamples the training folds."""
+        if self.fidelity_parameter is not None:
+            full = algorithm.get_params()[self.fidelity_parameter]
+            return algorithm.set_params(**{self.fidelity_parameter: max(1, int(round(full * budget)))}), \
+                train_test_splits
+
+        rng = np.random.RandomState(seed)
+        folds = [
+            (np.sort(rng.permutation(train)[:max(1, int(np.ceil(len(train) * budget)))]), test)
+            for train, test in train_test_splits.split(dataset.X, dataset.y)
+        ]
+        return algorithm, folds
+
+    def replay_trajectory(self, trajectory: Trajectory, scoring, search_data, eval_data, progress, loop_iterations,
+                          cpu_budget=CPUBudget()):
 
         scorer = get_scorer(scoring)
-        results = []
 
-        for item in trajectory.as_list:
-            losses = []
-            for seed in item.seeds:
-                progress.update(loop_iterations, advance=1)
-                algorithm = self.init_model(seed, search_data.metadata, **item.conf)
-                algorithm.fit(search_data.X, search_data.y)
-                loss = 1 - scorer(algorithm, eval_data.X, eval_data.y)
-                losses.append(loss)
+        # Incumbents change rarely, so consecutive entries often share the same configuration and seeds. Every unique
+        # combination only needs to be fitted and scored once.
+        runs = {}
+        for i, conf in enumerate(trajectory.confs):
+            for seed in trajectory.seeds_of(i).tolist():
+                runs.setdefault(self.run_key(conf, seed), (conf, seed))
+        progress.update(loop_iterations, total=len(runs))
+
+        keys = list(runs)
+        losses = {}
+        batch_size = effective_n_jobs(cpu_budget.cv_jobs)
+        with Parallel(n_jobs=cpu_budget.cv_jobs) as parallel:
+            for start in range(0, len(keys), batch_size):
+                batch = keys[start:start + batch_size]
+                batch_losses = parallel(
+                    delayed(self.fit_and_score)(conf, seed, scorer, search_data, eval_data, cpu_budget.model_jobs)
+                    for conf, seed in [runs[key] for key in batch]
+                )
+                losses.update(zip(batch, batch_losses))
+                progress.update(loop_iterations, advance=len(batch))
+
+        return trajectory.with_losses([
+            np.mean([losses[self.run_key(conf, seed)] for seed in trajectory.seeds_of(i).tolist()])
+            for i, conf in enumerate(trajectory.confs)
+        ])
+
+    def fit_and_score(self, conf, seed, scorer, search_data, eval_data, n_jobs=None):
+        algorithm = self.init_model(seed, search_data.metadata, n_jobs=n_jobs, **conf)
+        algorithm.fit(search_data.X, search_data.y)
+        return 1 - scorer(algorithm, eval_data.X, eval_data.y)
+
+    def fit_and_score_fold(self, conf, seed, scorer, dataset, train, test, n_jobs=None):
+        algorithm = self.init_model(seed, dataset.metadata, n_jobs=n_jobs, **conf)
+        return self.score_fold(algorithm, scorer, dataset, train, test)
+
+    def fit_and_score_arrays(self, conf, seed, scorer, metadata, X_train, y_train, X_test, y_test, n_jobs=None):
+        algorithm = self.init_model(seed, metadata, n_jobs=n_jobs, **conf)
+        return self.score_arrays(algorithm, scorer, X_train, y_train, X_test, y_test)
 
-            results.append(dataclasses.replace(item, loss=np.mean(losses)))
+    @staticmethod
+    def score_fold(algorithm, scorer, dataset, train, test):
+        return BaseTarget.timed_score_fold(algorithm, scorer, dataset, train, test)[0]
+
+    @staticmethod
+    def timed_score_fold(algorithm, scorer, dataset, train, test):
+        return BaseTarget.timed_score_arrays(algorithm, scorer, dataset.X[train], dataset.y[train], dataset.X[test],
+                                             dataset.y[test])
+
+    @staticmethod
+    def score_arrays(algorithm, scorer, X_train, y_train, X_test, y_test):
+        return BaseTarget.timed_score_arrays(algorithm, scorer, X_train, y_train, X_test, y_test)[0]
+
+    @staticmethod
+    def timed_score_arrays(algorithm, scorer, X_train, y_train, X_test, y_test):
+        # Scores one fold in the same way as cross_val_score, including a score of NaN when fitting fails. Also returns
+        # the fit time, the score time and the CPU time of the process that scored the fold.
+        tic, cpu = time.perf_counter(), time.process_time()
+        try:
+            algorithm.fit(X_train, y_train)
+        except Exception as e:
+            warnings.warn(f"Fitting failed, the score on this fold is set to NaN: {e!r}")
+            return np.nan, time.perf_counter() - tic, 0.0, time.process_time() - cpu
+        fitted = time.perf_counter()
+        score = scorer(algorithm, X_test, y_test)
+        return score, fitted - tic, time.perf_counter() - fitted, time.process_time() - cpu
 
-        return Trajectory(results)
+    @staticmethod
+    def run_key(conf: dict, seed: int):
+        return json.dumps(conf, sort_keys=True), seed
@@ -0,0 +1,61 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sklearn.metrics import get_scorer
+from threadpoolctl import threadpool_limits
+
+from hyperbench.target_algorithms.folds import SharedFolds
+
+# State of a worker process: the thread limits, and the folds of the search that it is working on
+_worker = {}
+
+
+class EvaluationExecutor:
+    """
+    A pool of worker processes that lives as long as the benchmark runner, instead of being started for every
+    evaluation. The workers import the target algorithms once when they start, and open the folds of a search by the
+    folder of the `SharedFolds`, once per search. A task only sends the unfitted model and the index of the fold, so the
+    data is never pickled.
+    """
+
+    def __init__(self, n_workers: int = None, n_threads: int = None):
+        self.n_workers = n_workers or os.cpu_count()
+        self.n_threads = n_threads
+        self._pool = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.n_workers, initializer=_init_worker, initargs=(self.n_threads,))
+        return self._pool
+
+    def score(self, folds: SharedFolds, tasks, scoring) -> list:
+        """Fits and scores every (algorithm, fold) task, and returns the scores in the same order."""
+        return [result[0] for result in self.score_timed(folds, tasks, scoring)]
+
+    def score_timed(self, folds: SharedFolds, tasks, scoring) -> list:
+        """Like `score`, but returns the fit time, score time and CPU time of every task with its score."""
+        futures = [self.pool.submit(_score_fold, folds.folder, fold, algorithm, scoring) for algorithm, fold in tasks]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+def _init_worker(n_threads):
+    if n_threads is not None:
+        _worker["limits"] = threadpool_limits(limits=n_threads)
+    # Import the target algorithms up front, so that the first evaluations do not have to wait for it
+    import hyperbench.target_algorithms  # noqa: F401
+
+
+def _score_fold(folder, fold, algorithm, scoring):
+    from hyperbench.target_algorithms.base import BaseTarget
+
+    if _worker.get("folder") != folder:
+        _worker["folder"], _worker["folds"] = folder, {}
+    if fold not in _worker["folds"]:
+        _worker["folds"][fold] = SharedFolds.open(folder, fold)
+    return BaseTarget.timed_score_arrays(algorithm, get_scorer(scoring), *_worker["folds"][fold])
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from joblib import Parallel
+
+from hyperbench.dataset import Dataset
+
+
+class SharedFolds:
+    """
+    The train/test folds of a search set, computed once instead of on every evaluation. The train and test arrays of
+    every fold are written to a temporary folder and opened as read-only memory maps, which joblib passes to its
+    workers by file name instead of pickling them. The folds also keep one pool of workers open for all evaluations,
+    unless they are given the `EvaluationExecutor` of the runner. Call `close()` to stop the pool and remove the folder.
+    """
+
+    def __init__(self, dataset: Dataset, train_test_splits, n_jobs=-1, executor=None):
+        self.train_test_splits = train_test_splits
+        self.n_jobs = n_jobs
+        self.indices = list(train_test_splits.split(dataset.X, dataset.y))
+        self.folder = tempfile.mkdtemp(prefix="hyperbench-folds-")
+        for i, (train, test) in enumerate(self.indices):
+            for name, array in [("X_train", dataset.X[train]), ("y_train", dataset.y[train]),
+                                ("X_test", dataset.X[test]), ("y_test", dataset.y[test])]:
+                np.save(os.path.join(self.folder, f"{i}-{name}.npy"), array)
+        self.arrays = [self.open(self.folder, i) for i in range(len(self.indices))]
+        self.executor = executor
+        self._parallel = None
+
+    @staticmethod
+    def open(folder, fold):
+        # Opens the train and test arrays of a fold, which is also done by the workers of the EvaluationExecutor
+        arrays = []
+        for name in ["X_train", "y_train", "X_test", "y_test"]:
+            file = os.path.join(folder, f"{fold}-{name}.npy")
+            try:
+                arrays.append(np.load(file, mmap_mode="r"))
+            except ValueError:
+                # Arrays with Python objects can not be memory-mapped
+                arrays.append(np.load(file, allow_pickle=True))
+        return tuple(arrays)
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def parallel(self) -> Parallel:
+        if self._parallel is None:
+            self._parallel = Parallel(n_jobs=self.n_jobs)
+            self._parallel.__enter__()
+        return self._parallel
+
+    def close(self):
+        if self._parallel is not None:
+            self._parallel.__exit__(None, None, None)
+            self._parallel = None
+        self.arrays = []
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import psutil
+from scipy.spatial.distance import cdist
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.svm import SVC
+
+
+class KernelCache:
+    """
+    Keeps kernel matrices in memory, up to `max_bytes`, and removes the least recently used ones when it is full. There
+    is one cache per process, shared by all SVMs in that process, so that the folds of a split and configurations with
+    the same gamma reuse the matrices that were computed before.
+    """
+
+    _shared = None
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def default_size():
+        # A quarter of the available memory, divided over the processes that may fit an SVM at the same time
+        return psutil.virtual_memory().available // (4 * (os.cpu_count() or 1))
+
+    @staticmethod
+    def shared(max_bytes: int = None):
+        # The default size is determined once, when the cache of the process is created
+        if KernelCache._shared is None:
+            KernelCache._shared = KernelCache(max_bytes or KernelCache.default_size())
+        elif max_bytes is not None and max_bytes != KernelCache._shared.max_bytes:
+            KernelCache._shared.resize(max_bytes)
+        return KernelCache._shared
+
+    @staticmethod
+    def fingerprint(X):
+        X = np.ascontiguousarray(X)
+        return hashlib.sha1(X.tobytes()).hexdigest(), X.shape
+
+    def resize(self, max_bytes: int):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self.n_bytes > self.max_bytes and self.entries:
+            _, removed = self.entries.popitem(last=False)
+            self.n_bytes -= removed.nbytes
+
+    def get(self, key, compute):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = compute()
+        if value.nbytes <= self.max_bytes:
+            value.setflags(write=False)
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = value
+                    self.n_bytes += value.nbytes
+                    self._evict()
+        return value
+
+    def rbf(self, X, Y, gamma: float):
+        # The squared distances do not depend on gamma, so they are shared by all kernels of the same pair of sets
+        x, y = self.fingerprint(X), self.fingerprint(Y)
+        distances = self.get(("distances", x, y), lambda: cdist(X, Y, "sqeuclidean"))
+        return self.get(("rbf", x, y, float(gamma)), lambda: np.exp(-gamma * distances))
+
+
+class PrecomputedKernelSVC(ClassifierMixin, BaseEstimator):
+    """
+    An RBF `SVC` that is fitted on a precomputed kernel matrix from the `KernelCache`. It has the same parameters as the
+    SVC of the SVM target, and `kernel_cache_size` sets the size of the cache in bytes. When the kernel matrix of the
+    training set does not fit in the cache, a regular RBF SVC is fitted instead.
+    """
+
+    def __init__(self, C=1.0, gamma=0.1, cache_size=200, random_state=None, kernel_cache_size=None):
+        self.C = C
+        self.gamma = gamma
+        self.cache_size = cache_size
+        self.random_state = random_state
+        self.kernel_cache_size = kernel_cache_size
+
+    def kernel(self, X):
+        X = np.asarray(X)
+        if not self.precomputed_:
+            return X
+        return KernelCache.shared(self.kernel_cache_size).rbf(X, self.X_fit_, self.gamma)
+
+    def fit(self, X, y):
+        self.X_fit_ = np.asarray(X)
+        self.precomputed_ = self.X_fit_.shape[0] ** 2 * 8 <= KernelCache.shared(self.kernel_cache_size).max_bytes
+        self.svc_ = SVC(C=self.C, kernel="precomputed" if self.precomputed_ else "rbf", gamma=self.gamma,
+                        cache_size=self.cache_size, random_state=self.random_state)
+        self.svc_.fit(self.kernel(self.X_fit_), y)
+        self.classes_ = self.svc_.classes_
+        return self
+
+    def decision_function(self, X):
+        return self.svc_.decision_function(self.kernel(X))
+
+    def predict(self, X):
+        return self.svc_.predict(self.kernel(X))
@@ -0,0 +1,35 @@
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import make_pipeline
+from sklearn.svm import LinearSVC
+
+from hyperbench.target_algorithms.base import BaseTarget
+from hyperbench.target_algorithms.svm import SVM
+
+
+class NystroemSVM(BaseTarget):
+    """
+    Approximates the RBF SVM with a Nyström approximation of the kernel and a linear SVM, so that the fit time grows
+    linearly with the number of rows. It has the same configuration space as the SVM target.
+    """
+
+    name = "NystroemSVC"
+    deterministic = False
+
+    @staticmethod
+    def init_model(seed, metadata, n_jobs=None, **config):
+        constants = NystroemSVM.constants()
+        return make_pipeline(
+            Nystroem(gamma=config["gamma"], n_components=constants["n_components"], random_state=seed, n_jobs=n_jobs),
+            LinearSVC(C=config["C"], dual=False, max_iter=constants["max_iter"], random_state=seed)
+        )
+
+    @staticmethod
+    def constants():
+        return {
+            "n_components": 500,
+            "max_iter": 1000
+        }
+
+    @staticmethod
+    def config_space():
+        return SVM.config_space()
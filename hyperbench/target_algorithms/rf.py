@@ -9,14 +9,15 @@ class RandomForest(BaseTarget):
 
     name = "RandomForest"
     deterministic = False
+    fidelity_parameter = "n_estimators"
 
     @staticmethod
-    def init_model(seed, metadata, **config):
+    def init_model(seed, metadata, n_jobs=None, **config):
 
         n_features = metadata.n_columns
         config["max_features"] = int(np.rint(np.power(n_features, config["max_features"])))
 
-        return RandomForestClassifier(**RandomForest.constants(), **config, random_state=seed)
+        return RandomForestClassifier(**RandomForest.constants(), **config, random_state=seed, n_jobs=n_jobs)
 
     @staticmethod
     def constants():
@@ -36,3 +37,13 @@ class RandomForest(BaseTarget):
         ])
         return cs
 
+
+class ThreadedRandomForest(RandomForest):
+    """
+    Gives the same results as the RandomForest target, but fits the trees of a fold in threads that use all cores of
+    the experiment, and runs the folds one after the other instead of in separate processes. Its results are stored as
+    a separate target, so that they are not skipped when RandomForest results exist and their timings are kept apart.
+    """
+
+    name = "RandomForest-threaded"
+    native_threads = True
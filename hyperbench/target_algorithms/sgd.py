@@ -12,8 +12,8 @@ class SGD(BaseTarget):
     deterministic = False
 
     @staticmethod
-    def init_model(seed, metadata, **config):
-        return SGDClassifier(**SGD.constants(), **config, random_state=seed)
+    def init_model(seed, metadata, n_jobs=None, **config):
+        return SGDClassifier(**SGD.constants(), **config, random_state=seed, n_jobs=n_jobs)
 
     @staticmethod
     def constants():
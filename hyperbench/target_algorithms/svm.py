@@ -2,6 +2,7 @@ import ConfigSpace
 from sklearn.svm import SVC
 
 from hyperbench.target_algorithms.base import BaseTarget
+from hyperbench.target_algorithms.kernel_cache import PrecomputedKernelSVC
 
 
 class SVM(BaseTarget):
@@ -10,7 +11,8 @@ class SVM(BaseTarget):
     deterministic = False
 
     @staticmethod
-    def init_model(seed, metadata, **config):
+    def init_model(seed, metadata, n_jobs=None, **config):
+        # SVC is single-threaded, so n_jobs is not used
         return SVC(**SVM.constants(), **config, random_state=seed)
 
     @staticmethod
@@ -27,3 +29,21 @@ class SVM(BaseTarget):
             ConfigSpace.Float("gamma", (2 ** -10, 2 ** 10), log=True, default=0.1)
         ])
         return cs
+
+
+class PrecomputedSVM(SVM):
+    """
+    The SVM target, but fitted on precomputed RBF kernel matrices. The matrices are cached per fold and gamma in a
+    `KernelCache` of `kernel_cache_size` bytes (by default derived from the available memory), so that folds and
+    configurations that share them do not compute them again. The precomputed kernel is not bit-identical to the one of
+    libsvm, so its results are stored as a separate target.
+    """
+
+    name = "SVC-precomputed"
+
+    def __init__(self, kernel_cache_size=None):
+        self.kernel_cache_size = kernel_cache_size
+
+    def init_model(self, seed, metadata, n_jobs=None, **config):
+        return PrecomputedKernelSVC(**SVM.constants(), **config, random_state=seed,
+                                    kernel_cache_size=self.kernel_cache_size)
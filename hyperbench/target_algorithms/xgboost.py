@@ -8,9 +8,10 @@ class XGBoost(BaseTarget):
 
     name = "XGBoost"
     deterministic = False
+    fidelity_parameter = "n_estimators"
 
     @staticmethod
-    def init_model(seed, metadata, **config):
+    def init_model(seed, metadata, n_jobs=None, **config):
 
         constants = XGBoost.constants()
 
@@ -18,7 +19,7 @@ class XGBoost(BaseTarget):
             constants["objective"] = "multi:softmax"
             constants["num_class"] = metadata.n_classes
 
-        return XGBClassifier(**constants, **config, random_state=seed)
+        return XGBClassifier(**constants, **config, random_state=seed, n_jobs=n_jobs)
 
     @staticmethod
     def constants():
@@ -41,3 +42,19 @@ class XGBoost(BaseTarget):
         ])
 
         return cs
+
+
+class HistXGBoost(XGBoost):
+    """
+    XGBoost with the histogram tree method, for which the scikit-learn interface bins the features of a fold once in a
+    QuantileDMatrix. The folds are fitted one after the other, each with all cores of the experiment. It has the same
+    configuration space as the XGBoost target, but the histogram method finds other splits than the exact method, so
+    its results are stored as a separate target.
+    """
+
+    name = "XGBoost-hist"
+    native_threads = True
+
+    @staticmethod
+    def init_model(seed, metadata, n_jobs=None, **config):
+        return XGBoost.init_model(seed, metadata, n_jobs=n_jobs, **config).set_params(tree_method="hist")
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from hyperbench.dashboard import aggregate
+
+
+class TestAggregate(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        rows = [[optimizer, str(seed), dataset] for optimizer in ["roar", "smac", "hyperboost"] for seed in [1, 2, 3]
+                for dataset in ["iris", "adult", "cars", "wine"]]
+        losses = rng.integers(0, 5, (len(rows), 40)) / 4  # Many ties
+        losses[rng.random(losses.shape) < 0.2] = np.nan
+        losses[:, :3] = np.nan
+        losses[:2] = np.nan
+        index = pd.DataFrame(rows, columns=["optimizer", "seed", "dataset"]).astype("category")
+        self.frame = pd.concat([index, pd.DataFrame(losses.astype(np.float32))], axis=1)
+        self.expected = pd.concat([index.astype(object), pd.DataFrame(losses)], axis=1)
+
+    def assertFrameEqual(self, result, expected):
+        result.columns = expected.columns
+        pd.testing.assert_frame_equal(result.astype({c: object for c in ["optimizer", "seed", "dataset"]
+                                                     if c in result.columns}),
+                                      expected, check_dtype=False, rtol=1e-5)
+
+    def test_normalize(self):
+        expected = self.expected.set_index(["optimizer", "dataset", "seed"]).groupby(["dataset"]) \
+            .transform(lambda x: (x - x.mean()) / x.std()).reset_index()
+        self.assertFrameEqual(aggregate.normalize(self.frame), expected)
+
+    def test_rank(self):
+        expected = self.expected.set_index(['optimizer', 'seed', 'dataset']).groupby(['dataset']).rank(axis=0) \
+            .reset_index()
+        self.assertFrameEqual(aggregate.rank(self.frame), expected)
+
+    def test_aggregate(self):
+        over_seeds = self.expected.groupby(['optimizer', 'dataset']).mean(numeric_only=True).reset_index()
+        self.assertFrameEqual(aggregate.aggregate_over_seeds(self.frame), over_seeds)
+
+        over_datasets = over_seeds.groupby(['optimizer']).mean(numeric_only=True).reset_index()
+        self.assertFrameEqual(aggregate.aggregate_over_datasets(aggregate.aggregate_over_seeds(self.frame)),
+                              over_datasets)
+
+
+if __name__ == '__main__':
+    unittest.main()
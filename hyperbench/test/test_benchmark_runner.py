@@ -0,0 +1,162 @@
+import glob
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.model_selection import ShuffleSplit
+from smac.facade.roar_facade import ROAR
+from smac.facade.smac_hpo_facade import SMAC4HPO
+
+from hyperbench.benchmark import BenchmarkConfig, BenchmarkRunner
+from hyperbench.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
+from hyperbench.optimizers import SMACBasedOptimizer
+from hyperbench.provider import Provider
+from hyperbench.target_algorithms import SVM
+from hyperbench.transformer import SimpleTransformer
+
+
+class SyntheticProvider(Provider):
+    """A small generated dataset, so that experiments can run without downloading data."""
+
+    def __init__(self, dataset_id):
+        self.id = dataset_id
+        self._data = None
+
+    @property
+    def data(self) -> Dataset:
+        if self._data is None:
+            X, y = make_classification(n_samples=150, n_features=5, random_state=self.id)
+            self._data = Dataset(X, y, Metadata(self.id, f"synthetic-{self.id}", [], list(range(5)), 150, 5, 2, 0))
+        return self._data
+
+    @property
+    def stats(self) -> dict:
+        return self.default_stats()
+
+
+def synthetic_benchmark(output_folder, optimizers, datasets=None, seeds=None, **kwargs) -> BenchmarkConfig:
+    return BenchmarkConfig(
+        budget=6, time_based=False, transformer=SimpleTransformer(), scoring="balanced_accuracy",
+        output_folder=output_folder, seeds=seeds or [1], target_algorithms=[SVM()],
+        datasets=datasets or [SyntheticProvider(1)], optimizers=optimizers,
+        search_eval_splits=ShuffleSplit(n_splits=1, test_size=0.25, random_state=0),
+        train_test_splits=ShuffleSplit(n_splits=3, test_size=0.2, random_state=0), **kwargs
+    )
+
+
+class Interrupted(KeyboardInterrupt):
+    pass
+
+
+class InterruptedSVM(SVM):
+    """Stops the benchmark after a number of evaluations, like a user pressing Ctrl+C."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def get_config_evaluator(self, *args, **kwargs):
+        evaluate = super().get_config_evaluator(*args, **kwargs)
+        calls = 0
+
+        def interrupted(config, seed):
+            nonlocal calls
+            calls += 1
+            if calls > self.limit:
+                raise Interrupted()
+            return evaluate(config, seed)
+        return interrupted
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+
+    def setUp(self):
+        # SMAC writes its output to the working directory
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def test_profile(self):
+        optimizers = [SMACBasedOptimizer(ROAR, "roar"), SMACBasedOptimizer(ROAR, "roar_capped", capping=0.5)]
+        for shared_folds in [False, True]:
+            output_folder = os.path.join(self.folder.name, f"results-{shared_folds}")
+            benchmark = synthetic_benchmark(output_folder, optimizers, profile=True, shared_folds=shared_folds)
+            runner = BenchmarkRunner(benchmark)
+            runner.start()
+
+            stats = {optimizer: stats for optimizer, _, _, stats in runner.results.load_stats(SVM().name)}
+            self.assertEqual(set(stats), {"roar", "roar_capped"})
+            for optimizer, experiment in stats.items():
+                sections = experiment["profile"]["sections"]
+                self.assertEqual(sections["load_data"]["count"], 1)
+                evaluations, fits = sections["evaluate"]["count"], sections["fit"]["count"]
+                self.assertEqual(evaluations, experiment["finished_ta_runs"])
+                # A capped evaluation stops after at least one and before all of its three folds
+                capped = experiment.get("capped_runs", 0)
+                self.assertLessEqual(evaluations * 3 - 2 * capped, fits)
+                self.assertLessEqual(fits, evaluations * 3 - capped)
+                if optimizer == "roar":
+                    self.assertEqual(fits, evaluations * 3)
+                else:
+                    self.assertGreater(capped, 0)
+                self.assertIsNotNone(runner.results.load_trace(SVM().name, optimizer, 1, "synthetic-1"))
+
+            # Capped runs are recorded with a censored loss, which is at least the threshold they were capped at
+            censored = [value for value in optimizers[1].initialized_optimizer.runhistory.data.values()
+                        if value.additional_info.get("censored")]
+            self.assertGreater(len(censored), 0)
+            for value in censored:
+                self.assertGreaterEqual(value.cost, value.additional_info["threshold"])
+
+    def test_batches(self):
+        benchmark = synthetic_benchmark(os.path.join(self.folder.name, "results"),
+                                        [SMACBasedOptimizer(SMAC4HPO, "smac_batch", batch_size=3)], profile=True)
+        benchmark.budget = 12
+        runner = BenchmarkRunner(benchmark)
+        runner.start()
+
+        [(_, _, _, stats)] = runner.results.load_stats(SVM().name)
+        self.assertEqual(stats["finished_ta_runs"], 12)
+        self.assertGreater(stats["batches"], 0)
+        # The acquisition function is maximized once per batch, not once per proposal
+        self.assertLess(stats["profile"]["sections"]["acquisition"]["count"], 3 * stats["batches"])
+        # The prefetched runs are counted as target algorithm time, not as time of the model
+        self.assertGreater(stats["prefetch_time"], 0)
+        self.assertGreaterEqual(stats["ta_time_used"], stats["prefetch_time"])
+        trace = runner.results.load_trace(SVM().name, "smac_batch", 1, "synthetic-1")
+        prefetched = sum(event["args"]["runs"] for event in trace["traceEvents"] if event["name"] == "prefetch")
+        evaluated = stats["profile"]["sections"]["evaluate"]["count"]
+        self.assertLess(evaluated, 12)
+        self.assertGreaterEqual(evaluated + prefetched, 12)
+
+    def test_resume(self):
+        output_folder = os.path.join(self.folder.name, "results")
+        benchmark = synthetic_benchmark(output_folder, [SMACBasedOptimizer(SMAC4HPO, "smac")])
+        benchmark.target_algorithms = [InterruptedSVM(4)]
+        with self.assertRaises(Interrupted):
+            BenchmarkRunner(benchmark).start()
+        [file] = glob.glob(os.path.join(output_folder, ".journal", "**", "*.jsonl"), recursive=True)
+        with open(file) as f:
+            journaled = [record["time"] for record in map(json.loads, f) if record["type"] == "run"]
+        self.assertEqual(len(journaled), 4)
+
+        benchmark.target_algorithms = [SVM()]
+        runner = BenchmarkRunner(benchmark)
+        runner.start()
+        [(_, _, _, stats)] = runner.results.load_stats(SVM().name)
+        self.assertEqual(stats["replayed_runs"], 4)
+        self.assertEqual(stats["finished_ta_runs"], 6)
+        # The replayed evaluations count with the time they originally took
+        self.assertGreaterEqual(stats["ta_time_used"], sum(journaled))
+
+
+if __name__ == '__main__':
+    unittest.main()
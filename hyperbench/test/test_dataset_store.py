@@ -0,0 +1,83 @@
+import dataclasses
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from hyperbench.dataset import Dataset, DatasetStore, SplitCache
+from hyperbench.dataset.metadata import Metadata
+from hyperbench.provider import OpenMLProvider
+from hyperbench.transformer import SimpleTransformer
+
+
+class TestDatasetStore(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = DatasetStore(self.folder.name)
+        X = np.array([[1.0, np.nan], [2.0, 0.0], [3.0, 1.0]])
+        y = np.array([0, 1, 1])
+        metadata = Metadata(11, "dummy", [1], [0], 3, 2, 2, np.isnan(X).sum())
+        self.dataset = Dataset(X, y, metadata)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_round_trip(self):
+        self.store.save("dummy", self.dataset, data_id=54)
+        loaded = self.store.load("dummy")
+
+        self.assertIsInstance(loaded.X, np.memmap)
+        np.testing.assert_array_equal(loaded.X, self.dataset.X)
+        np.testing.assert_array_equal(loaded.y, self.dataset.y)
+        self.assertEqual(loaded.metadata, self.dataset.metadata)
+        self.assertEqual(self.store.load_info("dummy"), {"data_id": 54})
+
+    def test_contains(self):
+        self.assertFalse(self.store.contains("dummy"))
+        self.store.save("dummy", self.dataset)
+        self.assertTrue(self.store.contains("dummy"))
+
+    def test_openml_provider_works_offline(self):
+        provider = OpenMLProvider(11, store=self.store)
+        self.store.save(provider.store_key, self.dataset, data_id=54)
+
+        self.assertEqual(provider.metadata, self.dataset.metadata)
+        self.assertEqual(provider.stats["data_url"], "https://www.openml.org/d/54")
+        np.testing.assert_array_equal(provider.data.X, self.dataset.X)
+
+        copy = pickle.loads(pickle.dumps(provider))
+        self.assertIsNone(copy._data)
+        np.testing.assert_array_equal(copy.data.X, self.dataset.X)
+
+    def test_select_contiguous_range_is_view(self):
+        self.assertTrue(np.shares_memory(self.dataset.select(np.array([1, 2])).X, self.dataset.X))
+        self.assertFalse(np.shares_memory(self.dataset.select(np.array([2, 1])).X, self.dataset.X))
+        np.testing.assert_array_equal(self.dataset.select([1, 2]).y, self.dataset.y[[1, 2]])
+
+    def test_split_cache(self):
+        cache = SplitCache(store=self.store)
+        search_set, eval_set = cache.get(self.dataset, [0, 2], [1], SimpleTransformer())
+        expected = SimpleTransformer().transform(*self.dataset.split([0, 2], [1]))
+        np.testing.assert_array_equal(search_set.X, expected[0].X)
+        np.testing.assert_array_equal(eval_set.X, expected[1].X)
+
+        self.assertIs(cache.get(self.dataset, [0, 2], [1], SimpleTransformer())[0], search_set)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Another process opens the stored sets instead of transforming them again
+        loaded, _ = SplitCache(store=self.store).get(self.dataset, [0, 2], [1], SimpleTransformer())
+        self.assertIsInstance(loaded.X, np.memmap)
+        np.testing.assert_array_equal(loaded.X, search_set.X)
+
+    def test_split_cache_key(self):
+        key = SplitCache.key(self.dataset, [0, 2], [1], SimpleTransformer())
+        self.assertEqual(SplitCache.key(self.dataset, [0, 2], [1], SimpleTransformer()), key)
+
+        # An edited file with the same name and shape, or other categorical columns, is transformed again
+        edited = dataclasses.replace(self.dataset, X=self.dataset.X + 1)
+        self.assertNotEqual(SplitCache.key(edited, [0, 2], [1], SimpleTransformer()), key)
+        metadata = dataclasses.replace(self.dataset.metadata, categorical=[], numeric=[0, 1])
+        recoded = dataclasses.replace(self.dataset, metadata=metadata)
+        self.assertNotEqual(SplitCache.key(recoded, [0, 2], [1], SimpleTransformer()), key)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.model_selection import ShuffleSplit
+
+from hyperbench.cache import EvaluationCache
+from hyperbench.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
+
+
+class DummyProgress:
+    def update(self, task, advance=None, total=None):
+        pass
+
+
+class DummyTarget:
+    name = "Dummy"
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.folder.name, "cache.sqlite")
+        X = np.arange(20, dtype=float).reshape(10, 2)
+        y = np.arange(10) % 2
+        self.dataset = Dataset(X, y, Metadata("1", "dummy", [], [0, 1], 10, 2, 2, 0))
+        self.splits = ShuffleSplit(n_splits=3, random_state=0, test_size=0.10)
+        self.calls = []
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def evaluate(self, config, seed):
+        self.calls.append((dict(config), seed))
+        return config["x"] / 10
+
+    def wrap(self, cache):
+        return cache.wrap(self.evaluate, DummyTarget(), self.dataset, self.splits, "accuracy", DummyProgress(), None)
+
+    def test_repeated_evaluations_are_cached(self):
+        evaluator = self.wrap(EvaluationCache(self.file))
+        self.assertEqual(evaluator({"x": 1, "y": 2.5}, 1), 0.1)
+        self.assertEqual(evaluator({"y": 2.5, "x": np.int64(1)}, 1), 0.1)
+        self.assertEqual(evaluator({"x": 1, "y": 2.5}, 2), 0.1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(evaluator.get_stats(), {"cache_hits": 1, "cache_misses": 2})
+
+    def test_cache_is_persistent(self):
+        self.wrap(EvaluationCache(self.file))({"x": 3}, 1)
+        evaluator = self.wrap(EvaluationCache(self.file))
+        self.assertEqual(evaluator({"x": 3}, 1), 0.3)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_different_data_is_not_shared(self):
+        self.wrap(EvaluationCache(self.file))({"x": 3}, 1)
+        self.dataset.X = self.dataset.X + 1
+        self.wrap(EvaluationCache(self.file))({"x": 3}, 1)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_least_recently_used_are_evicted(self):
+        cache = EvaluationCache(self.file, max_entries=2)
+        evaluator = self.wrap(cache)
+        evaluator({"x": 1}, 1)
+        evaluator({"x": 2}, 1)
+        evaluator({"x": 1}, 1)
+        evaluator({"x": 3}, 1)
+        self.assertEqual(len(cache), 2)
+        evaluator({"x": 1}, 1)
+        evaluator({"x": 2}, 1)
+        self.assertEqual([c["x"] for c, _ in self.calls], [1, 2, 3, 2])
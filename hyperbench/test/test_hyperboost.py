@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import ConfigSpace
+import numpy as np
+from catboost import CatBoostRegressor
+from smac.epm.utils import get_types
+
+from hyperbench.hyperboost import HyperboostEPM
+
+
+class TestHyperboostEPM(unittest.TestCase):
+
+    def setUp(self):
+        # CatBoost writes its training logs to the working directory
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+        self.cs = ConfigSpace.ConfigurationSpace(seed=0)
+        self.cs.add_hyperparameters([ConfigSpace.Float("x", (0, 1)), ConfigSpace.Float("y", (0, 1))])
+        self.rng = np.random.RandomState(0)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def model(self, **kwargs):
+        types, bounds = get_types(self.cs)
+        return HyperboostEPM(self.cs, types, bounds, seed=1, **kwargs)
+
+    def data(self, n_rows):
+        X = self.rng.rand(n_rows, 2)
+        return X, (X.sum(axis=1) + 0.1 * self.rng.rand(n_rows)).reshape(-1, 1)
+
+    def test_warm_start(self):
+        model = self.model(warm_start=True, max_new_rows=5, refit_interval=2)
+        X, Y = self.data(41)
+        expected = []
+        for n_rows in [20, 22, 24, 26, 40, 41]:
+            warm = model.can_warm_start(X[:n_rows])
+            model._train(X[:n_rows], Y[:n_rows])
+            expected.append((warm, model.n_warm_starts))
+        # The first model is new, then two warm starts until the refit interval, and too many new rows at 40
+        self.assertEqual(expected, [(False, 0), (True, 1), (True, 2), (False, 0), (False, 0), (True, 1)])
+        self.assertEqual(model.n_rows, 41)
+
+        cold = self.model()
+        cold._train(X[:22], Y[:22])
+        self.assertFalse(cold.can_warm_start(X[:23]))
+
+    def test_failed_warm_start(self):
+        model = self.model(warm_start=True)
+        X, Y = self.data(20)
+        model._train(X, Y)
+        # A previous model that can not be continued is replaced by a new model
+        model.catboost = "missing-model.cbm"
+        with self.assertLogs(level="WARNING") as logs:
+            model._train(X, Y)
+        self.assertIn("Warm start failed", logs.output[0])
+        self.assertIsInstance(model.catboost, CatBoostRegressor)
+        self.assertEqual(model.n_warm_starts, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from hyperbench.dataset import DatasetStore
+from hyperbench.provider import LocalFileProvider
+
+
+class TestLocalFileProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.frame = pd.DataFrame({
+            "size": [1.5, np.nan, 3.0, 4.0, 5.0],
+            "color": ["red", "blue", None, "red", "green"],
+            "count": [1, 2, 3, 4, 5],
+            "label": ["yes", "no", "yes", "no", "no"],
+        })
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def file(self, name):
+        return os.path.join(self.folder.name, name)
+
+    def check(self, provider):
+        data = provider.data
+        np.testing.assert_array_equal(data.X, [
+            [1.5, 0, 1], [np.nan, 1, 2], [3.0, np.nan, 3], [4.0, 0, 4], [5.0, 2, 5]
+        ])
+        np.testing.assert_array_equal(data.y, [0, 1, 0, 1, 1])
+        self.assertEqual(data.metadata.categorical, [1])
+        self.assertEqual(data.metadata.numeric, [0, 2])
+        self.assertEqual(data.metadata.n_missing, 2)
+        self.assertEqual(data.metadata.n_classes, 2)
+        self.assertEqual(data.metadata.n_rows, 5)
+
+    def test_csv_in_chunks(self):
+        self.frame.to_csv(self.file("data.csv"), index=False)
+        self.check(LocalFileProvider(self.file("data.csv"), target="label", chunksize=2))
+
+    def test_csv_with_mixed_chunks(self):
+        # pandas reads "code" as text in the first chunk and as integers in the second, "amount" becomes text in the
+        # second chunk because of the "?", and so does the target
+        with open(self.file("mixed.csv"), "w") as file:
+            file.write("code,amount,label\na,1.5,1\n1,2,1\n2,3,x\n1,?,x\na,5,1\n")
+        data = LocalFileProvider(self.file("mixed.csv"), target="label", chunksize=2).data
+        np.testing.assert_array_equal(data.X, [[0, 1.5], [1, 2], [2, 3], [1, np.nan], [0, 5]])
+        np.testing.assert_array_equal(data.y, [0, 0, 1, 1, 0])
+        self.assertEqual((data.metadata.categorical, data.metadata.numeric), ([0], [1]))
+        self.assertEqual(data.metadata.n_classes, 2)
+
+    def test_parquet(self):
+        self.frame.to_parquet(self.file("data.parquet"))
+        self.check(LocalFileProvider(self.file("data.parquet"), target="label", chunksize=2))
+
+    def test_npz(self):
+        X = np.array([[1.0, 0], [np.nan, 1]])
+        np.savez(self.file("data.npz"), X=X, y=np.array(["a", "b"]), categorical=np.array([1]))
+        data = LocalFileProvider(self.file("data.npz")).data
+        np.testing.assert_array_equal(data.X, X)
+        np.testing.assert_array_equal(data.y, [0, 1])
+        self.assertEqual(data.metadata.categorical, [1])
+        self.assertEqual(data.metadata.n_missing, 1)
+
+    def test_store(self):
+        self.frame.to_csv(self.file("data.csv"), index=False)
+        store = DatasetStore(self.file("store"))
+        provider = LocalFileProvider(self.file("data.csv"), target="label", store=store)
+        self.check(provider)
+        self.assertIsInstance(provider.data.X, np.memmap)
+        self.assertTrue(store.contains(provider.store_key))
+        self.assertEqual(LocalFileProvider(self.file("data.csv"), target="label", store=store).metadata,
+                         provider.data.metadata)
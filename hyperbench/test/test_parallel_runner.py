@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from smac.facade.roar_facade import ROAR
+
+from hyperbench.benchmark import ParallelBenchmarkRunner
+from hyperbench.optimizers import SMACBasedOptimizer
+from hyperbench.results import open_results
+from hyperbench.target_algorithms import SVM
+from hyperbench.test.test_benchmark_runner import SyntheticProvider, synthetic_benchmark
+
+
+class TestParallelBenchmarkRunner(unittest.TestCase):
+
+    def setUp(self):
+        # SMAC writes its output to the working directory
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def test_grid(self):
+        output_folder = os.path.join(self.folder.name, "results")
+        benchmark = synthetic_benchmark(output_folder, [SMACBasedOptimizer(ROAR, "roar")],
+                                        datasets=[SyntheticProvider(1), SyntheticProvider(2)], seeds=[1, 2])
+        runner = ParallelBenchmarkRunner(benchmark, n_workers=2)
+        self.assertEqual(len(runner.jobs()), 4)
+        runner.start()
+
+        results = open_results(output_folder)
+        expected = {(optimizer.name, str(seed), provider.metadata.name, stage)
+                    for optimizer in benchmark.optimizers for seed in benchmark.seeds
+                    for provider in benchmark.datasets for stage in ["search", "eval"]}
+        written = Counter((optimizer, str(seed), dataset, stage)
+                          for optimizer, seed, dataset, stage, _ in results.load_trajectories(SVM().name))
+        self.assertEqual(set(written), expected)
+        self.assertEqual(set(written.values()), {1})
+
+        # A second run skips the experiments that exist, so nothing is written again
+        versions = dict(results.versions(SVM().name))
+        self.assertEqual(set(versions), expected)
+        ParallelBenchmarkRunner(benchmark, n_workers=2).start()
+        self.assertEqual(dict(open_results(output_folder).versions(SVM().name)), versions)
+
+
+if __name__ == '__main__':
+    unittest.main()
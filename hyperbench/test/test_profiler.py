@@ -0,0 +1,39 @@
+import json
+import time
+import unittest
+
+from hyperbench.resources import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_sections(self):
+        profiler = Profiler()
+        for _ in range(2):
+            with profiler.section("evaluate", seed=1):
+                time.sleep(0.01)
+        profiler.record("fit", 0.5, 0.25, lane=1, fold=0)
+        profiler.wrap(lambda x: x, "epm_train")(1)
+
+        summary = profiler.summary()
+        self.assertEqual({name: s["count"] for name, s in summary["sections"].items()},
+                         {"evaluate": 2, "fit": 1, "epm_train": 1})
+        self.assertGreaterEqual(summary["sections"]["evaluate"]["wall"], 0.02)
+        self.assertEqual(summary["sections"]["fit"]["cpu"], 0.25)
+        self.assertGreater(summary["peak_rss"], 0)
+
+        trace = json.loads(json.dumps(profiler.trace()))
+        self.assertEqual([event["tid"] for event in trace["traceEvents"]], [0, 0, 1, 0])
+        self.assertEqual(trace["traceEvents"][2]["dur"], 0.5 * 1e6)
+        self.assertEqual(trace["traceEvents"][0]["args"]["seed"], 1)
+
+    def test_disabled(self):
+        profiler = Profiler(enabled=False)
+        with profiler.section("evaluate"):
+            pass
+        profiler.record("fit", 0.5)
+        self.assertEqual(profiler.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
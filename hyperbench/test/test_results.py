@@ -0,0 +1,127 @@
+import os
+import tempfile
+import unittest
+
+from hyperbench.results import open_results, JSONTreeBackend, SQLiteBackend, ResultsIndex, JournaledEvaluator
+from hyperbench.trajectory import Trajectory
+from hyperbench.trajectory.entry import Entry
+
+
+class DummyProgress:
+    def __init__(self):
+        self.completed = 0
+
+    def update(self, task, advance=None, total=None):
+        self.completed += advance or 0
+
+
+class TestResults(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.search = Trajectory([Entry({"C": 1.0}, 0.3, 1, 0.5, [1]), Entry({"C": 2.0}, 0.2, 4, 1.5, [1, 2])])
+        self.eval = Trajectory([Entry({"C": 1.0}, 0.35, 1, 0.5, [1]), Entry({"C": 2.0}, 0.25, 4, 1.5, [1, 2])])
+        self.stats = {"n_configs": 4, "dataset_id": 11, "perf_time": 2.0}
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def location(self, name):
+        return os.path.join(self.folder.name, name)
+
+    def check_backend(self, results):
+        self.assertFalse(results.exists("SVC", "smac", 1, "iris"))
+        results.commit("SVC", "smac", 1, "iris", self.search, self.eval, self.stats)
+        self.assertTrue(results.exists("SVC", "smac", 1, "iris"))
+        self.assertEqual(results.targets(), ["SVC"])
+
+        loaded = {stage: trajectory for _, _, _, stage, trajectory in results.load_trajectories("SVC")}
+        self.assertEqual(loaded["search"].as_list, self.search.as_list)
+        self.assertEqual(loaded["eval"].as_list, self.eval.as_list)
+        self.assertEqual(list(results.load_stats("SVC")), [("smac", "1", "iris", self.stats)])
+
+        self.assertIsNone(results.load_trace("SVC", "smac", 1, "iris"))
+        trace = {"traceEvents": [{"name": "evaluate", "ph": "X", "ts": 0.0, "dur": 10.0}]}
+        results.commit("SVC", "smac", 1, "iris", self.search, self.eval, self.stats, trace)
+        self.assertEqual(results.load_trace("SVC", "smac", 1, "iris"), trace)
+
+    def test_json_tree(self):
+        results = open_results(self.location("results"))
+        self.assertIsInstance(results, JSONTreeBackend)
+        self.check_backend(results)
+        self.assertTrue(os.path.exists(self.location("results/SVC/smac/1/iris/search.json")))
+
+        # A folder without statistics was not committed completely
+        os.makedirs(self.location("results/SVC/smac/2/iris"))
+        self.assertFalse(results.exists("SVC", "smac", 2, "iris"))
+
+    def test_sqlite(self):
+        results = open_results(self.location("results.sqlite"))
+        self.assertIsInstance(results, SQLiteBackend)
+        self.check_backend(results)
+
+    def test_export_to_tree(self):
+        results = open_results(self.location("results.sqlite"))
+        results.commit("SVC", "smac", 1, "iris", self.search, self.eval, self.stats)
+        tree = open_results(self.location("results"))
+        results.export(tree)
+
+        loaded = {stage: trajectory for _, _, _, stage, trajectory in tree.load_trajectories("SVC")}
+        self.assertEqual(loaded["eval"].as_list, self.eval.as_list)
+        self.assertEqual(list(tree.load_stats("SVC")), [("smac", "1", "iris", self.stats)])
+
+    def check_index(self, location):
+        results = open_results(location)
+        results.commit("SVC", "smac", 1, "iris", self.search, self.eval, self.stats)
+        index = ResultsIndex.open(location)
+        signature = index.update("SVC")
+        self.assertEqual(index.update("SVC"), signature)
+
+        loaded = []
+        load_trajectory = index.results.load_trajectory
+        index.results.load_trajectory = lambda *args: loaded.append(args) or load_trajectory(*args)
+        results.commit("SVC", "smac", 2, "iris", self.search, self.eval, self.stats)
+        self.assertNotEqual(index.update("SVC"), signature)
+        self.assertEqual(sorted(loaded), [("SVC", "smac", "2", "iris", "eval"), ("SVC", "smac", "2", "iris", "search")])
+
+        # A new index starts from the file written by the previous one
+        reopened = ResultsIndex.open(location)
+        reopened.results.load_trajectory = None
+        reopened.update("SVC")
+        trajectories = list(reopened.load_trajectories("SVC"))
+        self.assertEqual([details for *details, _ in trajectories],
+                         [["smac", "1", "iris", "eval"], ["smac", "1", "iris", "search"],
+                          ["smac", "2", "iris", "eval"], ["smac", "2", "iris", "search"]])
+        self.assertEqual(trajectories[0][-1].as_list, self.eval.as_list)
+
+    def test_index_json_tree(self):
+        self.check_index(self.location("results"))
+
+    def test_index_sqlite(self):
+        self.check_index(self.location("results.sqlite"))
+
+    def test_journal(self):
+        journal = open_results(self.location("results")).journal("SVC", "smac", 1, "iris")
+        evaluated = []
+        evaluator = JournaledEvaluator(lambda config, seed: evaluated.append(seed) or seed / 10, journal,
+                                       DummyProgress(), None)
+        for seed in [1, 2, 3]:
+            evaluator({"C": 1.0}, seed)
+        journal.close()
+
+        # The last record was cut off by a crash
+        with open(journal.file, "ab") as f:
+            f.write(b'{"type": "run", "config": {"C": 1.0}, "se')
+        self.assertEqual(len(journal.records()), 3)
+
+        progress = DummyProgress()
+        resumed = JournaledEvaluator(lambda config, seed: evaluated.append(seed) or seed / 10, journal, progress, None)
+        self.assertEqual(progress.completed, 3)  # The journaled runs are counted before they are replayed
+        self.assertEqual([resumed({"C": 1.0}, seed) for seed in [1, 2, 3, 4]], [0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(progress.completed, 3)  # Replays are not counted again, the evaluator counts the new run
+        self.assertEqual((evaluated, resumed.replayed), ([1, 2, 3, 4], 3))
+        journal.close()
+        self.assertEqual([record["seed"] for record in journal.records()], [1, 2, 3, 4])
+
+        journal.remove()
+        self.assertEqual(journal.records(), [])
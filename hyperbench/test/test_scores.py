@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from hyperbench.dashboard.scores import GroupScores, zscores, average_ranks
+
+
+class TestScores(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = rng.integers(0, 4, (30, 20)) / 3
+        self.values[rng.random(self.values.shape) < 0.3] = np.nan
+        self.values[:, 0] = np.nan
+        self.values[1:, 1] = np.nan
+        self.datasets = rng.choice(["iris", "adult", "wine"], 30)
+
+    def test_zscores(self):
+        frame = pd.DataFrame(self.values)
+        expected = frame.groupby(self.datasets).transform(lambda x: (x - x.mean()) / x.std())
+        np.testing.assert_allclose(GroupScores(zscores)(self.values, self.datasets), expected)
+
+    def test_ranks(self):
+        expected = pd.DataFrame(self.values).groupby(self.datasets).rank(axis=0)
+        np.testing.assert_array_equal(GroupScores(average_ranks)(self.values, self.datasets), expected)
+
+    def test_only_changed_groups_are_scored(self):
+        scored = []
+        scores = GroupScores(lambda values: scored.append(values) or average_ranks(values))
+        first = scores(self.values, self.datasets)
+        self.assertEqual(len(scored), 3)
+
+        # A new run on one dataset
+        values = np.vstack([self.values, np.full((1, 20), 0.5)])
+        second = scores(values, np.append(self.datasets, "wine"))
+        self.assertEqual(len(scored), 4)
+        np.testing.assert_array_equal(second[:30][self.datasets != "wine"], first[self.datasets != "wine"])
+
+
+if __name__ == '__main__':
+    unittest.main()
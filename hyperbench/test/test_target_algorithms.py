@@ -0,0 +1,239 @@
+import os
+import unittest
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ShuffleSplit, cross_val_score
+
+from hyperbench.dataset import Dataset
+from hyperbench.dataset.metadata import Metadata
+from hyperbench.optimizers import SMACBasedOptimizer
+from hyperbench.optimizers.capping import AdaptiveCap
+from hyperbench.resources import CPUBudget, Profiler
+from hyperbench.target_algorithms import RandomForest, SVM, PrecomputedSVM, NystroemSVM, ThreadedRandomForest, \
+    HistXGBoost, XGBoost, get_target_by_name
+from hyperbench.target_algorithms.executor import EvaluationExecutor
+from hyperbench.target_algorithms.folds import SharedFolds
+from hyperbench.target_algorithms.kernel_cache import KernelCache
+from hyperbench.trajectory import Trajectory
+from hyperbench.trajectory.entry import Entry
+
+
+class DummyProgress:
+    def __init__(self):
+        self.completed = 0
+
+    def update(self, task, advance=None, total=None):
+        self.completed += advance or 0
+
+
+class TestTargetAlgorithms(unittest.TestCase):
+
+    def setUp(self):
+        X, y = make_classification(n_samples=120, n_features=5, random_state=0)
+        self.dataset = Dataset(X, y, Metadata("1", "dummy", [], list(range(5)), 120, 5, 2, 0))
+        self.splits = ShuffleSplit(n_splits=3, random_state=0, test_size=0.2)
+
+    def test_prefetch_matches_evaluate(self):
+        for target in [RandomForest(), SVM(), NystroemSVM()]:
+            configs = target.config_space().sample_configuration(3)
+            runs = [(config, seed) for config in configs for seed in [1, 2]]
+
+            progress = DummyProgress()
+            evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", progress, None)
+            expected = [evaluate(config, seed) for config, seed in runs]
+
+            evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", progress, None)
+            evaluate.prefetch(runs)
+            self.assertEqual([evaluate(config, seed) for config, seed in runs], expected)
+            self.assertEqual(progress.completed, 2 * len(runs))
+
+    def test_prefetch_drops_previous_batch(self):
+        configs = SVM.config_space().sample_configuration(2)
+        profiler = Profiler()
+        evaluate = SVM().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(), None,
+                                              profiler=profiler)
+        evaluate.prefetch([(configs[0], 1)])
+        evaluate.prefetch([(configs[1], 1)])
+        evaluate(configs[0], 1)
+        evaluate(configs[1], 1)
+        self.assertEqual([event["name"] for event in profiler.events if event["name"] in ["prefetch", "evaluate"]],
+                         ["prefetch", "prefetch", "evaluate"])
+
+    def test_shared_folds(self):
+        folds = SharedFolds(self.dataset, self.splits, n_jobs=2)
+        self.assertIsInstance(folds.arrays[0][0], np.memmap)
+        for target in [RandomForest(), SVM()]:
+            configs = target.config_space().sample_configuration(3)
+            runs = [(config, seed) for config in configs for seed in [1, 2]]
+            evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                   None)
+            expected = [evaluate(config, seed) for config, seed in runs]
+
+            evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                   None, folds=folds)
+            self.assertEqual([evaluate(config, seed) for config, seed in runs], expected)
+            evaluate.prefetch(runs)
+            self.assertEqual([evaluate(config, seed) for config, seed in runs], expected)
+
+        folds.close()
+        self.assertFalse(os.path.exists(folds.folder))
+
+    def test_evaluation_executor(self):
+        executor = EvaluationExecutor(n_workers=2)
+        configs = RandomForest.config_space().sample_configuration(3)
+        runs = [(config, seed) for config in configs for seed in [1, 2]]
+        evaluate = RandomForest().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                       None)
+        expected = [evaluate(config, seed) for config, seed in runs]
+
+        # The same pool is used by several searches, each with its own folds
+        for _ in range(2):
+            folds = SharedFolds(self.dataset, self.splits, executor=executor)
+            evaluate = RandomForest().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy",
+                                                           DummyProgress(), None, folds=folds)
+            self.assertEqual([evaluate(config, seed) for config, seed in runs], expected)
+            evaluate.prefetch(runs)
+            self.assertEqual([evaluate(config, seed) for config, seed in runs], expected)
+            folds.close()
+
+        # Capped evaluations send their waves to the pool as well
+        folds = SharedFolds(self.dataset, self.splits, executor=executor)
+        waves, score = [], executor.score_timed
+        executor.score_timed = lambda folds, tasks, scoring: waves.append(len(tasks)) or score(folds, tasks, scoring)
+        evaluate = RandomForest().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                       None, folds=folds)
+        np.testing.assert_allclose([evaluate(config, seed, cap=lambda *args: False) for config, seed in runs], expected)
+        self.assertEqual(sum(waves), len(runs) * len(folds))
+        folds.close()
+        executor.shutdown()
+
+    def test_native_threads(self):
+        configs = RandomForest.config_space().sample_configuration(2)
+        expected = [RandomForest().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                        None)(config, 1) for config in configs]
+        for cpu_budget in [CPUBudget(), CPUBudget(2, 3)]:
+            self.assertEqual(ThreadedRandomForest().evaluation_budget(cpu_budget).cv_jobs, 1)
+            evaluate = ThreadedRandomForest().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy",
+                                                                   DummyProgress(), None, cpu_budget)
+            self.assertEqual([evaluate(config, 1) for config in configs], expected)
+
+        default = HistXGBoost.config_space().get_default_configuration()
+        self.assertEqual(HistXGBoost.init_model(1, self.dataset.metadata, **default).tree_method, "hist")
+
+        # The native-threaded targets are stored separately from the originals
+        for target in [ThreadedRandomForest, HistXGBoost]:
+            self.assertNotIn(target.name, [RandomForest.name, XGBoost.name])
+            self.assertIs(get_target_by_name(target.name), target)
+
+    def test_reduce_fidelity(self):
+        default = RandomForest.config_space().get_default_configuration()
+        forest = RandomForest.init_model(1, self.dataset.metadata, **default)
+        algorithm, cv = RandomForest().reduce_fidelity(forest, 0.25, 1, self.dataset, self.splits)
+        self.assertEqual((algorithm.n_estimators, cv), (25, self.splits))
+
+        _, folds = SVM().reduce_fidelity(SVM.init_model(1, self.dataset.metadata), 0.25, 1, self.dataset, self.splits)
+        self.assertEqual([(len(train), len(test)) for train, test in folds], [(24, 24)] * 3)
+
+        progress = DummyProgress()
+        evaluate = SVM().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", progress, None)
+        evaluate(SVM.config_space().get_default_configuration(), 1, budget=0.25)
+        self.assertEqual(progress.completed, 0.25)
+
+    def test_precomputed_svm(self):
+        configs = SVM.config_space().sample_configuration(4)
+        expected = [SVM().get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(), None)(
+            config, 1) for config in configs]
+
+        for kernel_cache_size in [None, 1000]:  # The second one is too small, so a regular SVC is fitted
+            target = PrecomputedSVM(kernel_cache_size)
+            evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                                   None)
+            np.testing.assert_allclose([evaluate(config, 1) for config in configs], expected)
+        self.assertNotEqual(PrecomputedSVM.name, SVM.name)
+        self.assertIs(get_target_by_name(PrecomputedSVM.name), PrecomputedSVM)
+
+    def test_kernel_cache(self):
+        cache = KernelCache(max_bytes=3 * 800)
+        for i in range(4):
+            cache.get(i, lambda: np.zeros(100))
+        self.assertEqual(list(cache.entries), [1, 2, 3])
+        cache.get(1, lambda: None)
+        cache.get(4, lambda: np.zeros(100))
+        self.assertEqual((list(cache.entries), cache.hits), ([3, 1, 4], 1))
+
+    def test_replay_trajectory(self):
+        search_data, eval_data = self.dataset.split(range(90), range(90, 120))
+        first, second = [dict(config) for config in RandomForest.config_space().sample_configuration(2)]
+        # The incumbent stays the same over several entries and is evaluated on more seeds, then changes and returns
+        trajectory = Trajectory([Entry(first, 0.3, 1, 0.1, [1]), Entry(first, 0.25, 3, 0.3, [1, 2]),
+                                 Entry(second, 0.2, 5, 0.5, [2, 1]), Entry(first, 0.15, 8, 0.8, [2, 3])])
+
+        # Every entry replayed on its own, as before the runs were shared between entries
+        scorer = get_scorer("balanced_accuracy")
+        expected = []
+        for entry in trajectory:
+            losses = []
+            for seed in entry.seeds:
+                algorithm = RandomForest.init_model(seed, search_data.metadata, **entry.conf)
+                algorithm.fit(search_data.X, search_data.y)
+                losses.append(1 - scorer(algorithm, eval_data.X, eval_data.y))
+            expected.append(np.mean(losses))
+
+        for cpu_budget in [CPUBudget(1), CPUBudget(2, 3)]:
+            progress = DummyProgress()
+            replayed = RandomForest().replay_trajectory(trajectory, "balanced_accuracy", search_data, eval_data,
+                                                        progress, None, cpu_budget)
+            np.testing.assert_allclose(replayed.loss, expected)
+            self.assertEqual(progress.completed, 5)  # The unique (configuration, seed) runs
+            self.assertEqual([entry.seeds for entry in replayed], [entry.seeds for entry in trajectory])
+
+    def test_capped_cross_val(self):
+        target = SVM()
+        svm = SVM.init_model(1, self.dataset.metadata, **SVM.config_space().get_default_configuration())
+        expected = 1 - np.mean(cross_val_score(svm, self.dataset.X, self.dataset.y, cv=self.splits,
+                                               scoring="balanced_accuracy"))
+
+        never = target.capped_cross_val(svm, self.dataset, self.splits, "balanced_accuracy", lambda *args: False)
+        self.assertAlmostEqual(never, expected)
+
+        loss, info = target.capped_cross_val(svm, self.dataset, self.splits, "balanced_accuracy", lambda *args: True)
+        self.assertTrue(info["capped"])
+        self.assertLess(info["folds"], 3)
+
+    def test_capped_cross_val_shared_folds(self):
+        target = SVM()
+        config = SVM.config_space().get_default_configuration()
+        expected = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(),
+                                               None)(config, 1)
+
+        folds = SharedFolds(self.dataset, self.splits, n_jobs=2)
+        target.timed_score_fold = None  # The dataset is not split again
+        evaluate = target.get_config_evaluator(self.dataset, self.splits, "balanced_accuracy", DummyProgress(), None,
+                                               folds=folds)
+        self.assertAlmostEqual(evaluate(config, 1, cap=lambda *args: False), expected)
+        loss, info = evaluate(config, 1, cap=lambda *args: True)
+        self.assertTrue(info["capped"])
+        self.assertLess(info["folds"], 3)
+        folds.close()
+
+    def test_adaptive_cap(self):
+        cap = AdaptiveCap(threshold=0.2)
+        self.assertTrue(cap([0.9], 3))  # Even two perfect folds can not bring the mean below 0.2
+        self.assertFalse(cap([0.3], 3))
+        self.assertTrue(cap([0.5, 0.52], 3))
+        self.assertFalse(cap([0.1, 0.5], 3))
+
+    def test_capped_loss_is_censored(self):
+        optimizer = SMACBasedOptimizer(None, "capped", capping=0.95)
+        optimizer.incumbent_loss = lambda config, seed: 0.3
+        capped = optimizer.cap_evaluations(lambda config, seed, budget, cap: (0.2, {"capped": True, "folds": 1}))
+        loss, info = capped({"C": 1.0}, 1)
+        self.assertEqual(loss, 0.3)  # Never below the threshold that the run was capped at
+        self.assertEqual((info["censored"], info["partial_loss"], info["threshold"]), (True, 0.2, 0.3))
+        self.assertEqual(optimizer.cap_evaluations(lambda *args, **kwargs: (0.5, {}))({"C": 1.0}, 1)[0], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+
+from hyperbench.trajectory import Trajectory
+from hyperbench.trajectory.entry import Entry
+
+
+def loss_over_time(trajectory, max_time, step_size=1, speedup=1):
+    # Reference implementation that fills the curve one entry at a time
+    x = np.arange(0, max_time, step_size)
+    y = np.full_like(x, np.nan, dtype=float)
+    for t in trajectory.as_list:
+        if t.at_time / speedup > max_time:
+            return x, y
+        y[np.digitize(t.at_time / speedup, x):] = t.loss
+    return x, y
+
+
+def loss_per_iteration(trajectory, max_iter, speedup=1):
+    x = np.arange(0, max_iter)
+    y = np.full_like(x, np.nan, dtype=float)
+    for t in trajectory.as_list:
+        if t.at_iteration / speedup > max_iter:
+            return x, y
+        y[np.digitize(t.at_iteration / speedup, x, right=True):] = t.loss
+    return x, y
+
+
+class TestTrajectory(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.trajectories = [Trajectory([])]
+        for _ in range(50):
+            n = rng.integers(1, 15)
+            iterations = np.sort(rng.integers(1, 120, n))
+            times = np.sort(rng.uniform(0, 120, n))
+            losses = np.sort(rng.uniform(0, 1, n))[::-1]
+            self.trajectories.append(Trajectory([
+                Entry({"i": i}, float(loss), int(iteration), float(time), [0])
+                for i, (loss, iteration, time) in enumerate(zip(losses, iterations, times))
+            ]))
+
+    def test_loss_per_iteration(self):
+        for trajectory in self.trajectories:
+            for max_iter, speedup in [(100, 1), (100, 2), (50, 1.5), (0, 1)]:
+                x, y = trajectory.get_loss_per_iteration(max_iter, speedup)
+                expected_x, expected_y = loss_per_iteration(trajectory, max_iter, speedup)
+                np.testing.assert_array_equal(x, expected_x)
+                np.testing.assert_array_equal(y, expected_y)
+
+    def test_loss_over_time(self):
+        for trajectory in self.trajectories:
+            for max_time, step_size, speedup in [(100, 1, 1), (100, 0.5, 2), (60, 3, 0.5)]:
+                x, y = trajectory.get_loss_over_time(max_time, step_size, speedup)
+                expected_x, expected_y = loss_over_time(trajectory, max_time, step_size, speedup)
+                np.testing.assert_array_equal(x, expected_x)
+                np.testing.assert_array_equal(y, expected_y)
+
+    def test_batched(self):
+        x, y = Trajectory.get_losses(self.trajectories, 100, time_based=False, speedup=2)
+        self.assertEqual(y.shape, (len(self.trajectories), 100))
+        for row, trajectory in zip(y, self.trajectories):
+            np.testing.assert_array_equal(row, loss_per_iteration(trajectory, 100, 2)[1])
+
+    def test_columns(self):
+        entries = [Entry({"C": 1.0}, 0.3, 1, 0.5, [1]), Entry({"C": 2.0}, 0.2, 4, 1.5, [1, 2]),
+                   Entry({"C": 1.0}, 0.1, 9, 3.0, [3])]
+        trajectory = Trajectory(entries)
+
+        self.assertEqual(trajectory.configs, [{"C": 1.0}, {"C": 2.0}])
+        self.assertEqual(trajectory.conf_ids.tolist(), [0, 1, 0])
+        self.assertEqual(trajectory.as_list, entries)
+        self.assertEqual((trajectory.max_iter, trajectory.max_time), (9, 3.0))
+        self.assertEqual(trajectory[1:].as_list, entries[1:])
+        self.assertEqual(trajectory[::2].as_list, entries[::2])
+        self.assertEqual(trajectory[-1], entries[-1])
+        self.assertEqual(trajectory.with_losses([0.5, 0.4, 0.3]).loss.tolist(), [0.5, 0.4, 0.3])
+
+        dicts = trajectory.to_dicts()
+        self.assertEqual(Trajectory.from_dicts(dicts).to_dicts(), dicts)
+        self.assertIsInstance(dicts[0]["at_iteration"], int)
+        self.assertNotIn("budget", dicts[0])
+
+    def test_cost(self):
+        entries = [Entry({"C": 1.0}, 0.3, 1, 0.5, [1], budget=1 / 9, at_cost=1 / 9),
+                   Entry({"C": 2.0}, 0.2, 8, 1.5, [1], budget=1.0, at_cost=2.0)]
+        trajectory = Trajectory(entries)
+        self.assertEqual(trajectory.max_cost, 2.0)
+        self.assertEqual(Trajectory.from_dicts(trajectory.to_dicts()).as_list, entries)
+        self.assertEqual(trajectory[1:][0].at_cost, 2.0)
+
+        _, y = trajectory.get_loss(5, cost_based=True)
+        np.testing.assert_array_equal(y, [np.nan, 0.3, 0.2, 0.2, 0.2])
+
+        # Trajectories without costs are plotted over their iterations
+        _, y = Trajectory.get_losses([self.trajectories[1]], 100, cost_based=True)
+        np.testing.assert_array_equal(y[0], loss_per_iteration(self.trajectories[1], 100)[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
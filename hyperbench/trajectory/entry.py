@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Union, Optional
 
 
 @dataclass(eq=False)
@@ -9,6 +9,8 @@ class Entry:
     at_iteration: Union[int, float]  # float only when budget multiplier was used
     at_time: any
     seeds: list[int]
+    budget: Optional[float] = None  # Fidelity of the evaluations of the incumbent, only for multi-fidelity optimizers
+    at_cost: Optional[float] = None  # Number of full evaluations that the evaluations so far together cost
 
     def __eq__(self, other):
         cond1 = self.conf == other.conf
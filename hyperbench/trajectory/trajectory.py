@@ -1,3 +1,4 @@
+import copy
 import dataclasses
 import json
 
@@ -7,57 +8,215 @@ from hyperbench.trajectory.entry import Entry
 
 
 class Trajectory:
+    """
+    The incumbents of a search, stored as columns. The losses and budgets are arrays, every configuration is stored
+    once in `configs` and referred to by its index in `conf_ids`, and the seeds of entry i are
+    `seeds[seed_offsets[i]:seed_offsets[i + 1]]`. The entries can still be accessed as `Entry` objects through
+    indexing, iteration or `as_list`. Trajectories of multi-fidelity optimizers also have the columns `budget` and
+    `at_cost`, which are None for other trajectories.
+    """
+
+    budget = None
+    at_cost = None
+
+    def __init__(self, as_list=()):
+        self._set_columns([e.conf for e in as_list], [e.loss for e in as_list], [e.at_iteration for e in as_list],
+                          [e.at_time for e in as_list], [e.seeds for e in as_list], [e.budget for e in as_list],
+                          [e.at_cost for e in as_list])
+
+    def _set_columns(self, confs, losses, iterations, times, seeds, budgets=(), costs=()):
+        keys = [repr(conf) for conf in confs]
+        ids, self.configs = {}, []
+        for key, conf in zip(keys, confs):
+            if key not in ids:
+                ids[key] = len(self.configs)
+                self.configs.append(conf)
+        self.conf_ids = np.array([ids[key] for key in keys], dtype=np.int32)
+
+        self.loss = Trajectory.column(losses)
+        self.at_iteration = Trajectory.column(iterations)
+        self.at_time = Trajectory.column(times)
+
+        self.seed_offsets = np.zeros(len(seeds) + 1, dtype=np.int64)
+        self.seed_offsets[1:] = np.cumsum([len(s) for s in seeds])
+        self.seeds = np.array([seed for s in seeds for seed in s], dtype=np.int64)
+
+        self.budget = Trajectory.optional_column(budgets)
+        self.at_cost = Trajectory.optional_column(costs)
 
-    def __init__(self, as_list):
-        self.as_list = as_list
+    @staticmethod
+    def column(values):
+        # Integers are kept as integers, so that they are saved in the same way as they were loaded
+        array = np.asarray(values)
+        return array.astype(np.int64) if array.dtype.kind in "iu" else array.astype(float)
+
+    @staticmethod
+    def optional_column(values):
+        if all(value is None for value in values):
+            return None
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+    def __len__(self):
+        return len(self.loss)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(np.arange(len(self))[index])
+        i = range(len(self))[index]
+        return Entry(
+            conf=self.configs[self.conf_ids[i]],
+            loss=self.loss[i].item(),
+            at_iteration=self.at_iteration[i].item(),
+            at_time=self.at_time[i].item(),
+            seeds=self.seeds_of(i).tolist(),
+            budget=None if self.budget is None else self.budget[i].item(),
+            at_cost=None if self.at_cost is None else self.at_cost[i].item()
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def as_list(self):
+        return list(self)
+
+    @property
+    def confs(self):
+        return [self.configs[i] for i in self.conf_ids]
+
+    def seeds_of(self, index):
+        return self.seeds[self.seed_offsets[index]:self.seed_offsets[index + 1]]
+
+    def take(self, indices):
+        # Selects entries by their indices; the configuration table is shared
+        indices = np.asarray(indices, dtype=np.int64)
+        starts, lengths = self.seed_offsets[indices], np.diff(self.seed_offsets)[indices]
+
+        result = copy.copy(self)
+        result.conf_ids = self.conf_ids[indices]
+        result.loss = self.loss[indices]
+        result.at_iteration = self.at_iteration[indices]
+        result.at_time = self.at_time[indices]
+        result.budget = None if self.budget is None else self.budget[indices]
+        result.at_cost = None if self.at_cost is None else self.at_cost[indices]
+        result.seed_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        result.seeds = self.seeds[np.repeat(starts - result.seed_offsets[:-1], lengths) + np.arange(lengths.sum())]
+        return result
+
+    def with_losses(self, losses):
+        result = copy.copy(self)
+        result.loss = np.asarray(losses, dtype=float)
+        return result
 
     def save(self, file: str):
         with open(file, "w+") as f:
-            json.dump([dataclasses.asdict(e) for e in self.as_list], f, indent=2)
+            json.dump(self.to_dicts(), f, indent=2)
         return self
 
+    def to_dicts(self):
+        # The columns of multi-fidelity optimizers are left out when they are not used
+        optional = [name for name in ["budget", "at_cost"] if getattr(self, name) is None]
+        return [{k: v for k, v in dataclasses.asdict(e).items() if k not in optional} for e in self]
+
     @property
     def max_time(self):
-        return self.as_list[-1].at_time
+        return self.at_time[-1].item()
 
     @property
     def max_iter(self):
-        return self.as_list[-1].at_iteration
+        return self.at_iteration[-1].item()
+
+    @property
+    def max_cost(self):
+        return self.max_iter if self.at_cost is None else self.at_cost[-1].item()
 
     @staticmethod
     def load(file: str):
         with open(file, "r") as f:
-            data = json.load(f)
-            entries = [Entry(e['conf'], e['loss'], e['at_iteration'], e['at_time'], e['seeds']) for e in data]
-            return Trajectory(entries)
+            return Trajectory.from_dicts(json.load(f))
 
-    def get_loss(self, max_budget, time_based=False, step_size=1, speedup=1):
+    @staticmethod
+    def from_dicts(data):
+        trajectory = Trajectory.__new__(Trajectory)
+        trajectory._set_columns([e['conf'] for e in data], [e['loss'] for e in data], [e['at_iteration'] for e in data],
+                                [e['at_time'] for e in data], [e['seeds'] for e in data],
+                                [e.get('budget') for e in data], [e.get('at_cost') for e in data])
+        return trajectory
+
+    def get_loss(self, max_budget, time_based=False, step_size=1, speedup=1, cost_based=False):
         if time_based:
             return self.get_loss_over_time(max_budget, step_size, speedup=speedup)
+        if cost_based:
+            x, y = Trajectory.get_losses([self], max_budget, speedup=speedup, cost_based=True)
+            return x, y[0]
         return self.get_loss_per_iteration(max_budget, speedup=speedup)
 
     def get_loss_over_time(self, max_time, step_size=1, speedup=1):
-
-        x = np.arange(0, max_time, step_size)
-        y = np.full_like(x, np.nan, dtype=float)
-
-        for t in self.as_list:
-            if t.at_time / speedup > max_time:
-                return x, y
-            index = np.digitize(t.at_time / speedup, x)
-            y[index:] = t.loss
-
-        return x, y
+        x, y = Trajectory.get_losses([self], max_time, time_based=True, step_size=step_size, speedup=speedup)
+        return x, y[0]
 
     def get_loss_per_iteration(self, max_iter, speedup=1):
+        x, y = Trajectory.get_losses([self], max_iter, time_based=False, speedup=speedup)
+        return x, y[0]
 
-        x = np.arange(0, max_iter)
-        y = np.full_like(x, np.nan, dtype=float)
-
-        for t in self.as_list:
-            if t.at_iteration / speedup > max_iter:
-                return x, y
-            index = np.digitize(t.at_iteration / speedup, x, right=True)
-            y[index:] = t.loss
-
+    @staticmethod
+    def get_losses(trajectories, max_budget, time_based=False, step_size=1, speedup=1, cost_based=False):
+        """
+        Computes the loss curves of multiple trajectories at once.
+
+        Parameters
+        ----------
+        trajectories: list[Trajectory]
+            The trajectories to compute the loss curves for
+        max_budget: float
+            The number of iterations, or the number of seconds if `time_based` is set
+        time_based: bool
+            Whether the curves are over time or over iterations
+        step_size: float
+            Distance between two points of a time based curve
+        speedup: float
+            The budget (iterations or time) of the trajectories is divided by this number
+        cost_based: bool
+            Whether curves that are not time based are over the cost of the evaluations (in full evaluations) instead
+            of the number of evaluations. Trajectories without costs are plotted over their iterations.
+
+        Returns
+        -------
+        x: np.ndarray of shape (n_points,)
+            The budget at each point of the curves
+        y: np.ndarray of shape (n_trajectories, n_points)
+            The loss of the incumbent at each point, or NaN before the first incumbent was found
+        """
+        x = np.arange(0, max_budget, step_size) if time_based else np.arange(0, max_budget)
+
+        positions, losses, rows = [], [], []
+        for row, trajectory in enumerate(trajectories):
+            if time_based:
+                at = trajectory.at_time / speedup
+            elif cost_based and trajectory.at_cost is not None:
+                at = trajectory.at_cost / speedup
+            else:
+                at = trajectory.at_iteration / speedup
+
+            # Entries after the first one that exceeds the budget are not part of the curve
+            exceeds = np.flatnonzero(at > max_budget)
+            n = exceeds[0] if len(exceeds) > 0 else len(at)
+
+            positions.append(at[:n])
+            losses.append(trajectory.loss[:n])
+            rows.append(np.full(n, row))
+
+        positions, losses, rows = np.concatenate([[], *positions]), np.concatenate([[], *losses]), \
+            np.concatenate([np.array([], dtype=int), *rows])
+
+        # The curve steps to the loss of an entry at the first point that is at least (iterations) or past (time) the
+        # position of the entry. At every point, the last entry that stepped in before or at that point is used.
+        starts = np.searchsorted(x, positions, side="right" if time_based else "left")
+        last = np.full((len(trajectories), len(x) + 1), -1)
+        np.maximum.at(last, (rows, starts), np.arange(len(positions)))
+        last = np.maximum.accumulate(last, axis=1)[:, :-1]
+
+        y = np.full(last.shape, np.nan)
+        found = last >= 0
+        y[found] = losses[last[found]]
         return x, y
@@ -5,6 +5,7 @@ from smac.facade.smac_hpo_facade import SMAC4HPO
 
 from hyperbench.benchmark import BenchmarkConfig
 from hyperbench.benchmark import BenchmarkRunner
+from hyperbench.dataset import DatasetStore
 from hyperbench.hyperboost import HyperboostEPM
 from hyperbench.provider import OpenMLProvider
 from hyperbench.optimizers import SMACBasedOptimizer
@@ -39,6 +40,9 @@ excluded = [
 ]
 tasks = [task for task in tasks if task not in excluded]
 
+# Keeps a local copy of the datasets, so that they only need to be downloaded once
+store = DatasetStore("datasets")
+
 
 benchmark = BenchmarkConfig(
     budget=300,
@@ -49,11 +53,13 @@ benchmark = BenchmarkConfig(
 
     seeds=[2268061101, 2519249986, 338403738],
     target_algorithms=[RandomForest(), XGBoost(), SGD(), SVM()],
-    datasets=[OpenMLProvider(task) for task in tasks],
+    datasets=[OpenMLProvider(task, store=store) for task in tasks],
     optimizers=[
         SMACBasedOptimizer(ROAR, "roar", budget_multiplier=2),
         SMACBasedOptimizer(SMAC4HPO, "smac", budget_multiplier=1),
-        SMACBasedOptimizer(SMAC4HPO, "hyperboost", budget_multiplier=1, model=HyperboostEPM)
+        SMACBasedOptimizer(SMAC4HPO, "hyperboost", budget_multiplier=1, model=HyperboostEPM),
+        SMACBasedOptimizer(SMAC4HPO, "hyperboost-warm", budget_multiplier=1, model=HyperboostEPM,
+                           model_kwargs={"warm_start": True})
     ],
     search_eval_splits=StratifiedShuffleSplit(
         n_splits=1, test_size=0.25, random_state=0